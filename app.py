@@ -2,14 +2,30 @@
 
 import base64
 import hashlib
+import hmac
+import io
 import json
 import os
+import secrets
+import threading
 import time
-from flask import Flask, request, jsonify, redirect, send_from_directory, session, send_file
-import sqlite3
+from flask import Flask, Response, request, jsonify, redirect, send_file, send_from_directory, session, g
 from flask_cors import CORS
-import requests
+from pypdf.errors import PdfReadError
+from werkzeug.utils import secure_filename
 from database import db
+from gateway import CashfreeClient, GatewayError, GatewayUnavailable
+from idempotency import IdempotencyStore, IdempotencyTimeout, derive_key
+from cache import TTLCache
+from ids import NodeLease, SnowflakeGenerator, default_node_id
+from metrics import DB_BUCKETS, LATENCY_BUCKETS, Metrics, histogram_samples, waitress_dispatcher
+from pdf_merge import PdfMerger
+from profiler import PROFILE_HEADER, RequestProfile, profile_threads, sign_request, verify_request
+from reconcile import ReconcileSchedule, Reconciler
+from static_cache import CachedPage, send_directory_file, send_hashed_file, versioned_url
+from upload_index import UploadIndex
+from webhooks import SIGNATURE_HEADER, TIMESTAMP_HEADER, WebhookProcessor, order_id_of, verify_signature
+from zip_stream import stream_zip
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-change-this-in-production'  # Change this!
@@ -18,10 +34,205 @@ CORS(app)  # Enable CORS for all routes
 # 🔑 Production credentials from environment variables
 CASHFREE_APP_ID = os.getenv('CASHFREE_APP_ID', 'your_production_app_id')
 CASHFREE_SECRET_KEY = os.getenv('CASHFREE_SECRET_KEY', 'your_production_secret_key')
-CASHFREE_BASE_URL = "https://api.cashfree.com/pg/orders"  # Production URL
+# Production API by default; point at mock_cashfree.py for local load and latency tests
+CASHFREE_API_BASE = os.getenv('CASHFREE_API_BASE', 'https://api.cashfree.com/pg').rstrip('/')
+CASHFREE_BASE_URL = f"{CASHFREE_API_BASE}/orders"
+
+# One pooled keep-alive client for every gateway call (timeouts, retries, latency metrics)
+cashfree = CashfreeClient(
+    CASHFREE_APP_ID,
+    CASHFREE_SECRET_KEY,
+    base_url=CASHFREE_API_BASE,
+    connect_timeout=float(os.getenv('CASHFREE_CONNECT_TIMEOUT', '3.05')),
+    read_timeout=float(os.getenv('CASHFREE_READ_TIMEOUT', '15')),
+    # One slot per waitress thread (waitress-serve defaults to 4; match --threads if you change it).
+    # Callers wait up to GATEWAY_ACQUIRE_TIMEOUT seconds for a slot before being refused.
+    max_in_flight=int(os.getenv('GATEWAY_MAX_IN_FLIGHT', '4')),
+    acquire_timeout=float(os.getenv('GATEWAY_ACQUIRE_TIMEOUT', '2')),
+    failure_threshold=int(os.getenv('GATEWAY_FAILURE_THRESHOLD', '5')),
+    reset_timeout=float(os.getenv('GATEWAY_RESET_TIMEOUT', '30'))
+)
+
+# Time-ordered unique order/customer IDs. The node id is ORDER_NODE_ID when set (needed
+# when processes on other hosts use other databases), otherwise leased from the database
+ORDER_NODE_ID = default_node_id()
+order_ids = SnowflakeGenerator(
+    node_id=ORDER_NODE_ID,
+    lease=NodeLease(db, lease_seconds=int(os.getenv('ORDER_NODE_LEASE_SECONDS', '300'))) if ORDER_NODE_ID is None else None
+)
+
+# Gateway webhooks are queued in SQLite by /payment-callback and applied in batches here
+webhook_processor = WebhookProcessor(
+    db,
+    workers=int(os.getenv('WEBHOOK_WORKERS', '2')),
+    batch_size=int(os.getenv('WEBHOOK_BATCH_SIZE', '100')),
+    poll_interval=float(os.getenv('WEBHOOK_POLL_INTERVAL', '5'))
+)
+if webhook_processor.workers > 0:
+    webhook_processor.start()
+
+# Periodic reconciliation of pending orders (RECONCILE_INTERVAL seconds, 0 = off; large
+# backfills are better run with `python reconcile.py`). It shares the checkout client,
+# its breaker and in-flight limit, so keep it to one slow worker here.
+reconcile_schedule = ReconcileSchedule(
+    Reconciler(
+        db,
+        cashfree,
+        workers=int(os.getenv('RECONCILE_WORKERS', '1')),
+        rate=float(os.getenv('RECONCILE_RATE', '5')),
+        min_age=int(os.getenv('RECONCILE_MIN_AGE', '900'))
+    ),
+    interval=int(os.getenv('RECONCILE_INTERVAL', '0'))
+)
+if reconcile_schedule.interval > 0:
+    reconcile_schedule.start()
 
 # Configuration loaded from environment variables
 
+# SQL instrumentation: X-DB-Queries / X-DB-Time response headers outside production
+# (APP_ENV=development, staging, ...), and a log line for any request over budget
+# (0 turns a budget off). DB_REPEAT_BUDGET flags one statement run that many times
+# in a request, the usual sign of an N+1 loop.
+APP_ENV = os.getenv('APP_ENV', 'production').lower()
+DB_DEBUG_HEADERS = APP_ENV != 'production'
+DB_QUERY_BUDGET = int(os.getenv('DB_QUERY_BUDGET', '10'))
+DB_TIME_BUDGET_MS = float(os.getenv('DB_TIME_BUDGET_MS', '100'))
+DB_REPEAT_BUDGET = int(os.getenv('DB_REPEAT_BUDGET', '5'))
+
+# Prometheus metrics, served at /metrics. Requests record into per-thread shards (no locks
+# on the request path); cache, gateway and waitress figures are read when scraped.
+metrics = Metrics()
+metrics.describe('app_requests_total', 'counter', 'Requests by route, method and status code')
+metrics.describe('app_request_duration_seconds', 'histogram', 'Request latency by route', LATENCY_BUCKETS)
+metrics.describe('app_requests_in_flight', 'gauge', 'Requests being handled, by route')
+metrics.describe('app_db_queries_total', 'counter', 'SQL statements issued while handling requests, by route')
+metrics.describe('app_request_db_seconds', 'histogram', 'Time spent in SQL per request, by route', DB_BUCKETS)
+waitress_tasks = None  # waitress's task dispatcher, found on the first request served by waitress
+
+@app.before_request
+def start_request_metrics():
+    global waitress_tasks
+    if waitress_tasks is None:
+        waitress_tasks = waitress_dispatcher(request.environ)
+    # The URL rule, not the path, so /api/course-material/<course_code> is one series
+    g.metrics_route = request.url_rule.rule if request.url_rule else 'unmatched'
+    g.metrics_started = time.perf_counter()
+    metrics.inc('app_requests_in_flight', (('route', g.metrics_route),))
+
+@app.after_request
+def record_request_metrics(response):
+    # Registered first, so it runs after every other after_request hook
+    route = (('route', g.metrics_route),)
+    metrics.observe('app_request_duration_seconds', time.perf_counter() - g.metrics_started, route)
+    metrics.inc('app_requests_total', route + (('method', request.method), ('status', str(response.status_code))))
+    metrics.inc('app_db_queries_total', route, db.query_stats.count)
+    metrics.observe('app_request_db_seconds', db.query_stats.time, route)
+    return response
+
+@app.teardown_request
+def finish_request_metrics(exc=None):
+    route = g.pop('metrics_route', None)
+    if route is not None:
+        metrics.dec('app_requests_in_flight', (('route', route),))
+
+# Single-request profiling: a request carrying a PROFILE_HEADER value signed with
+# PROFILE_SECRET (mint one at /api/admin/profile/request-token) is sampled while it runs;
+# the response's X-Profile-Id names the stacks at /api/admin/profile/<id>. Off when unset.
+PROFILE_SECRET = os.getenv('PROFILE_SECRET', '')
+PROFILE_MAX_SECONDS = int(os.getenv('PROFILE_MAX_SECONDS', '60'))
+profile_results = TTLCache(maxsize=32, ttl=3600)
+profile_lock = threading.Lock()  # one all-threads profile at a time
+
+@app.before_request
+def start_request_profile():
+    if PROFILE_SECRET and PROFILE_HEADER in request.headers:
+        if verify_request(PROFILE_SECRET, request.headers[PROFILE_HEADER], request.method, request.path):
+            g.request_profile = RequestProfile(threading.get_ident())
+
+@app.after_request
+def finish_request_profile(response):
+    profile = g.pop('request_profile', None)
+    if profile is not None:
+        sampler = profile.stop()
+        profile_id = secrets.token_hex(8)
+        profile_results.set(profile_id, {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round(profile.duration * 1000, 1),
+            "samples": sampler.samples,
+            "collapsed": sampler.collapsed()
+        })
+        response.headers['X-Profile-Id'] = profile_id
+    return response
+
+@app.teardown_request
+def stop_request_profile(exc=None):
+    # after_request does not run if the response could not be built
+    profile = g.pop('request_profile', None)
+    if profile is not None:
+        profile.stop()
+
+@app.before_request
+def reset_query_stats():
+    # Per-thread SQL statement counter; read db.query_stats.count to see what a request cost
+    db.query_stats.reset()
+
+@app.after_request
+def report_query_stats(response):
+    stats = db.query_stats
+    elapsed_ms = stats.time * 1000
+    if DB_DEBUG_HEADERS:
+        response.headers['X-DB-Queries'] = str(stats.count)
+        response.headers['X-DB-Time'] = f"{elapsed_ms:.2f}"
+
+    repeated = stats.repeated(DB_REPEAT_BUDGET) if DB_REPEAT_BUDGET else []
+    if (DB_QUERY_BUDGET and stats.count > DB_QUERY_BUDGET) or \
+            (DB_TIME_BUDGET_MS and elapsed_ms > DB_TIME_BUDGET_MS) or repeated:
+        print(f"⚠️ DB budget exceeded: {request.method} {request.path} -> "
+              f"{stats.count} queries, {elapsed_ms:.1f} ms")
+        for sql, executions, seconds in repeated[:3]:
+            print(f"   🔁 {executions}x ({seconds * 1000:.1f} ms): {' '.join(sql.split())[:160]}")
+    return response
+
+def current_user():
+    """Return the logged-in user for this request, verifying the session at most once"""
+    if 'current_user' not in g:
+        user_token = session.get('user_token')
+        result = db.verify_session(user_token) if user_token else None
+        g.current_user = result["user"] if result and result["success"] else None
+    return g.current_user
+
+def current_admin():
+    """Return the logged-in admin for this request, verifying the session at most once"""
+    if 'current_admin' not in g:
+        admin_token = session.get('admin_token')
+        result = db.verify_admin_session(admin_token) if admin_token else None
+        g.current_admin = result["admin"] if result and result["success"] else None
+    return g.current_admin
+
+def order_belongs_to_request(order):
+    """True if the order was started by this browser session or belongs to the logged-in user"""
+    if session.get('order_id') == order["order_id"]:
+        return True
+    user = current_user()
+    return user is not None and user["id"] == order["user_id"]
+
+def order_for_request(order_id):
+    """The stored payment order if it belongs to this browser session or the logged-in user"""
+    if not order_id:
+        return None
+    result = db.get_payment_order(order_id)
+    if not result["success"]:
+        return None
+    order = result["order"]
+    return order if order_belongs_to_request(order) else None
+
+def session_payment_data():
+    """Verified payment details for this session's order (None until payment succeeds)"""
+    order = order_for_request(session.get('order_id'))
+    return order["payment"] if order else None
+
 # PhonePe sandbox URL
 PHONEPE_URL = "https://api-preprod.phonepe.com/apis/pg-sandbox/pg/v1/pay"
 
@@ -36,39 +247,23 @@ def index():
         return redirect('/welcome')
     
     # Verify session is still valid
-    result = db.verify_session(user_token)
-    if not result["success"]:
+    if current_user() is None:
         session.clear()
         return redirect('/welcome')
     
-    # Check if this is a payment success redirect
-    payment_success = request.args.get('payment_success') == 'true'
-    payment_data = session.get('payment_data', {}) if payment_success else {}
-    
-    # User is authenticated, serve the form with payment data
-    if payment_success and payment_data:
-        # For payment success, we need to pass data to the template
-        # Read the file and replace template variables manually
-        with open('index.html', 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Replace template variables with proper JavaScript
-        content = content.replace('{% if payment_success and payment_data %}', 'if (true) {')
-        content = content.replace('{% endif %}', '}')
-        content = content.replace('{{ payment_data | tojson }}', str(payment_data).replace("'", '"'))
-        
-        return content
-    else:
-        # For normal access, also process template variables to avoid syntax errors
-        with open('index.html', 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Replace template variables with JavaScript that won't execute
-        content = content.replace('{% if payment_success and payment_data %}', 'if (false) {')
-        content = content.replace('{% endif %}', '}')
-        content = content.replace('{{ payment_data | tojson }}', '{}')
-        
-        return content
+    # User is authenticated, serve the form. The page body is identical for everyone;
+    # payment data after a successful payment is fetched from /api/payment-data.
+    return index_page.respond(request, reload=app.debug)
+
+def render_index_template(content):
+    """Neutralise the old server-side template markers once, at load time"""
+    content = content.replace('{% if payment_success and payment_data %}', 'if (false) {')
+    content = content.replace('{% endif %}', '}')
+    content = content.replace('{{ payment_data | tojson }}', '{}')
+    return content
+
+index_page = CachedPage('index.html', preprocess=render_index_template)
+index_page.current()
 
 # Public landing page for unauthenticated users
 @app.route("/welcome")
@@ -80,14 +275,15 @@ os.makedirs(os.path.join('uploads', 'english'), exist_ok=True)
 os.makedirs(os.path.join('uploads', 'hindi'), exist_ok=True)
 
 # Route to serve static files (PDFs, images, etc.) including nested paths
+# (ETag, 304 and Range support; add ?v=<hash> for an immutable, content-addressed URL)
 @app.route('/pdfs/<path:filename>')
 def serve_pdf(filename):
-    return send_from_directory('pdfs', filename)
+    return send_directory_file('pdfs', filename, request)
 
 # Route to serve uploaded files (English/Hindi)
 @app.route('/uploads/<path:filename>')
 def serve_upload(filename):
-    return send_from_directory('uploads', filename)
+    return send_directory_file('uploads', filename, request)
 
 @app.route('/images/<filename>')
 def serve_image(filename):
@@ -168,9 +364,9 @@ def get_profile():
         if not user_token:
             return jsonify({"success": False, "error": "Not authenticated"}), 401
         
-        result = db.verify_session(user_token)
-        if result["success"]:
-            return jsonify(result)
+        user = current_user()
+        if user is not None:
+            return jsonify({"success": True, "user": user})
         else:
             session.clear()
             return jsonify({"success": False, "error": "Session expired"}), 401
@@ -196,8 +392,7 @@ def require_auth(f):
         if not user_token:
             return jsonify({"success": False, "error": "Authentication required"}), 401
         
-        result = db.verify_session(user_token)
-        if not result["success"]:
+        if current_user() is None:
             session.clear()
             return jsonify({"success": False, "error": "Session expired"}), 401
         
@@ -205,6 +400,26 @@ def require_auth(f):
     decorated_function.__name__ = f.__name__
     return decorated_function
 
+def gateway_unavailable_response(e):
+    response = jsonify({"success": False, "error": f"{e}. Please try again shortly.", "retry_after": e.retry_after})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+# Gateway-bound route decorator: 503 + Retry-After instead of queueing behind a degraded
+# gateway (circuit open, or no in-flight slot freed up within GATEWAY_ACQUIRE_TIMEOUT)
+def gateway_bound(f):
+    def decorated_function(*args, **kwargs):
+        breaker = cashfree.breaker.snapshot()
+        if breaker["state"] == "open":
+            return gateway_unavailable_response(GatewayUnavailable("Payment gateway circuit is open", breaker["retry_after"]))
+        try:
+            return f(*args, **kwargs)
+        except GatewayUnavailable as e:
+            return gateway_unavailable_response(e)
+    decorated_function.__name__ = f.__name__
+    return decorated_function
+
 # Route to serve login page
 @app.route("/login")
 def login_page():
@@ -232,10 +447,8 @@ def logout_page():
 @require_auth
 def dashboard():
     try:
-        user_token = session.get('user_token')
-        result = db.verify_session(user_token)
-        if result["success"]:
-            user_data = result["user"]
+        user_data = current_user()
+        if user_data is not None:
             return jsonify({
                 "success": True,
                 "user": user_data,
@@ -246,6 +459,15 @@ def dashboard():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+# Payment data for the payment-success view of index.html
+@app.route("/api/payment-data")
+@require_auth
+def get_payment_data():
+    payment_data = session_payment_data()
+    if not payment_data:
+        return jsonify({"success": False, "error": "No payment data"}), 404
+    return jsonify({"success": True, "payment_data": payment_data})
+
 # Test payment route for debugging
 @app.route("/test-payment")
 def test_payment():
@@ -257,15 +479,16 @@ def test_payment():
 
 # Test Cashfree credentials route
 @app.route("/test-cashfree-credentials")
+@gateway_bound
 def test_cashfree_credentials():
     try:
         # Test with minimal payload
         test_payload = {
-            "order_id": f"TEST{int(time.time())}",
+            "order_id": order_ids.next_order_id("TEST"),
             "order_amount": 1,  # ₹1
             "order_currency": "INR",
             "customer_details": {
-                "customer_id": f"TESTUSER{int(time.time())}",
+                "customer_id": order_ids.next_order_id("TESTUSER"),
                 "customer_name": "Test User",
                 "customer_email": "test@example.com",
                 "customer_phone": "9999999999"
@@ -276,17 +499,8 @@ def test_cashfree_credentials():
             }
         }
         
-        headers = {
-            "x-client-id": CASHFREE_APP_ID,
-            "x-client-secret": CASHFREE_SECRET_KEY,
-            "x-api-version": "2023-08-01",
-            "Content-Type": "application/json"
-        }
-        
-        # Testing Cashfree credentials
-        
         # Make test request
-        response = requests.post(CASHFREE_BASE_URL, headers=headers, json=test_payload)
+        response = cashfree.create_order(test_payload)
         
         return jsonify({
             "success": True,
@@ -300,6 +514,8 @@ def test_cashfree_credentials():
             }
         })
         
+    except GatewayUnavailable:
+        raise  # answered with 503 by gateway_bound
     except Exception as e:
         return jsonify({
             "success": False,
@@ -313,19 +529,11 @@ def test_cashfree_credentials():
 
 # Check Cashfree account configuration
 @app.route("/check-cashfree-config")
+@gateway_bound
 def check_cashfree_config():
     try:
-        # Check account configuration
-        headers = {
-            "x-client-id": CASHFREE_APP_ID,
-            "x-client-secret": CASHFREE_SECRET_KEY,
-            "x-api-version": "2023-08-01",
-            "Content-Type": "application/json"
-        }
-        
         # Try to get account info
-        account_url = f"https://api.cashfree.com/pg/merchants/{CASHFREE_APP_ID}"
-        response = requests.get(account_url, headers=headers)
+        response = cashfree.get_merchant(CASHFREE_APP_ID)
         
         return jsonify({
             "success": True,
@@ -339,6 +547,8 @@ def check_cashfree_config():
             }
         })
         
+    except GatewayUnavailable:
+        raise  # answered with 503 by gateway_bound
     except Exception as e:
         return jsonify({
             "success": False,
@@ -351,129 +561,178 @@ def check_cashfree_config():
         }), 500
 
 
-# Route to initiate payment for assignments (now protected)
-@app.route("/initiate-payment", methods=["POST"])
-@require_auth
-def initiate_payment():
-    try:
-        data = request.json
-        courses = data.get("courses", []) or data.get("subjects", [])
-        student_name = data.get("studentName", "")
-        enrollment = data.get("enrollmentNumber", "")
-        programme_code = data.get("programSelection", "")
-        course_code = data.get("courseCode", "")
-        study_center_code = data.get("studyCenterCode", "")
-        study_center_name = data.get("studyCenterAddress", "")
-        medium_selection = data.get("mediumSelection", "")
-        exam_type = data.get("examType", "")
-        semester_number = data.get("semesterNumber", "")
-        year_selection = data.get("yearSelection", "")
-        mobile_number = data.get("mobileNumber", "")
-        email_id = data.get("emailId", "")
-
-        if not courses or not student_name or not enrollment:
-            return jsonify({"success": False, "error": "Missing required fields"}), 400
-
-        amount_rupees = max(len(courses), 1)  # Minimum ₹1, ₹1 per course
-
-        # ✅ Create unique orderId
-        order_id = f"ORD{int(time.time())}"
-        
-        # Validate required data
-        customer_email = email_id if email_id else "test@example.com"
-        customer_phone = mobile_number if mobile_number else "9999999999"
-        
-        # Ensure valid email format
-        if not customer_email or "@" not in customer_email:
-            customer_email = "heypayal12345@gmail.com"
-        
-        # Ensure valid phone format (10 digits minimum)
-        if not customer_phone or len(customer_phone.replace("+", "").replace("-", "").replace(" ", "")) < 10:
-            customer_phone = "9334273197"
-        
-        # Payment data validated
-
-        payload = {
-            "order_id": order_id,
-            "order_amount": amount_rupees,
-            "order_currency": "INR",
-            "customer_details": {
-                "customer_id": f"CUST{int(time.time())}",
-                "customer_name": student_name,
-                "customer_email": customer_email,
-                "customer_phone": customer_phone
-            },
-            "order_meta": {
-                "return_url": "https://ignou-assignment-portal.onrender.com/payment-success?order_id={order_id}",
-                "notify_url": "https://ignou-assignment-portal.onrender.com/payment-callback"
-            }
+def create_payment_order(data, user_id):
+    """Create a Cashfree order for the checkout form in `data` and store it server-side.
+
+    Returns (response_body, status_code, order_id); order_id is None unless the
+    order was created. Touches no request or session state, so the result can
+    be replayed for duplicate submissions.
+    """
+    courses = data.get("courses", []) or data.get("subjects", [])
+    student_name = data.get("studentName", "")
+    enrollment = data.get("enrollmentNumber", "")
+    programme_code = data.get("programSelection", "")
+    course_code = data.get("courseCode", "")
+    study_center_code = data.get("studyCenterCode", "")
+    study_center_name = data.get("studyCenterAddress", "")
+    medium_selection = data.get("mediumSelection", "")
+    exam_type = data.get("examType", "")
+    semester_number = data.get("semesterNumber", "")
+    year_selection = data.get("yearSelection", "")
+    mobile_number = data.get("mobileNumber", "")
+    email_id = data.get("emailId", "")
+
+    if not courses or not student_name or not enrollment:
+        return {"success": False, "error": "Missing required fields"}, 400, None
+
+    amount_rupees = max(len(courses), 1)  # Minimum ₹1, ₹1 per course
+
+    # ✅ Create unique orderId (unique even for orders placed in the same millisecond)
+    order_id = order_ids.next_order_id("ORD")
+    
+    # Validate required data
+    customer_email = email_id if email_id else "test@example.com"
+    customer_phone = mobile_number if mobile_number else "9999999999"
+    
+    # Ensure valid email format
+    if not customer_email or "@" not in customer_email:
+        customer_email = "heypayal12345@gmail.com"
+    
+    # Ensure valid phone format (10 digits minimum)
+    if not customer_phone or len(customer_phone.replace("+", "").replace("-", "").replace(" ", "")) < 10:
+        customer_phone = "9334273197"
+    
+    # Payment data validated
+
+    payload = {
+        "order_id": order_id,
+        "order_amount": amount_rupees,
+        "order_currency": "INR",
+        "customer_details": {
+            "customer_id": order_ids.next_order_id("CUST"),
+            "customer_name": student_name,
+            "customer_email": customer_email,
+            "customer_phone": customer_phone
+        },
+        "order_meta": {
+            "return_url": "https://ignou-assignment-portal.onrender.com/payment-success?order_id={order_id}",
+            "notify_url": "https://ignou-assignment-portal.onrender.com/payment-callback"
         }
+    }
 
-        headers = {
-            "x-client-id": CASHFREE_APP_ID,
-            "x-client-secret": CASHFREE_SECRET_KEY,
-            "x-api-version": "2023-08-01",
-            "Content-Type": "application/json"
-        }
-        
-        response = requests.post(CASHFREE_BASE_URL, headers=headers, json=payload)
+    response = cashfree.create_order(payload)
 
-        if response.status_code != 200:
-            return jsonify({"success": False, "error": f"Cashfree API error: {response.text}"}), 400
+    if response.status_code != 200:
+        return {"success": False, "error": f"Cashfree API error: {response.text}"}, 400, None
 
-        try:
-            res_data = response.json()
-            
-            # Check for payment_session_id to construct payment URL
-            if "payment_session_id" in res_data:
-                payment_session_id = res_data["payment_session_id"]
-                payment_url = f"https://payments.cashfree.com/order/#/{payment_session_id}"
-            else:
-                return jsonify({
-                    "success": False, 
-                    "error": f"Payment session ID not found in response. Available fields: {list(res_data.keys())}. Response: {res_data}"
-                }), 400
-            
-            # Save payment request details to session
-            session['payment_request'] = {
-                "studentName": student_name,
-                "enrollmentNumber": enrollment,
-                "emailId": customer_email,
-                "mobileNumber": customer_phone,
-                "programmeCode": programme_code,
-                "courseCode": course_code,
-                "studyCenterCode": study_center_code,
-                "studyCenterName": study_center_name,
-                "mediumSelection": medium_selection,
-                "examType": exam_type,
-                "semesterNumber": semester_number,
-                "yearSelection": year_selection,
-                "submittedElsewhere": data.get("submittedElsewhere", ""),
-                "submissionDetails": data.get("submissionDetails", ""),
-                "confirmation": data.get("confirmation", ""),
-                "courses": courses,
-                "amount": amount_rupees,
-                "order_id": order_id
-            }
-            
-            return jsonify({
-                "success": True,
-                "paymentUrl": payment_url,
-                "paymentSessionId": payment_session_id,
-                "transactionId": order_id,
-                "amount": amount_rupees,
-                "courses": courses
-            })
-            
-        except json.JSONDecodeError as e:
-            return jsonify({
-                "success": False, 
-                "error": f"Invalid JSON response from Cashfree: {response.text}"
-            }), 400
+    try:
+        res_data = response.json()
+    except json.JSONDecodeError:
+        return {"success": False, "error": f"Invalid JSON response from Cashfree: {response.text}"}, 400, None
+
+    # Check for payment_session_id to construct payment URL
+    if "payment_session_id" not in res_data:
+        return {
+            "success": False, 
+            "error": f"Payment session ID not found in response. Available fields: {list(res_data.keys())}. Response: {res_data}"
+        }, 400, None
+    payment_session_id = res_data["payment_session_id"]
+    payment_url = f"https://payments.cashfree.com/order/#/{payment_session_id}"
+
+    payment_request = {
+        "studentName": student_name,
+        "enrollmentNumber": enrollment,
+        "emailId": customer_email,
+        "mobileNumber": customer_phone,
+        "programmeCode": programme_code,
+        "courseCode": course_code,
+        "studyCenterCode": study_center_code,
+        "studyCenterName": study_center_name,
+        "mediumSelection": medium_selection,
+        "examType": exam_type,
+        "semesterNumber": semester_number,
+        "yearSelection": year_selection,
+        "submittedElsewhere": data.get("submittedElsewhere", ""),
+        "submissionDetails": data.get("submissionDetails", ""),
+        "confirmation": data.get("confirmation", ""),
+        "courses": courses,
+        "amount": amount_rupees,
+        "order_id": order_id
+    }
+    saved = db.create_payment_order(order_id, user_id, amount_rupees, payment_request)
+    if not saved["success"]:
+        return saved, 500, None
+
+    body = {
+        "success": True,
+        "paymentUrl": payment_url,
+        "paymentSessionId": payment_session_id,
+        "transactionId": order_id,
+        "amount": amount_rupees,
+        "courses": courses
+    }
+    return body, 200, order_id
 
+# Duplicate checkouts (double-clicked "Pay", retried requests) replay the first order
+# instead of creating another one; only successful orders are remembered
+payment_idempotency = IdempotencyStore(
+    maxsize=10000,
+    ttl=int(os.getenv('IDEMPOTENCY_TTL', '600')),
+    should_store=lambda result: result[1] == 200
+)
+
+# Route to initiate payment for assignments (now protected)
+@app.route("/initiate-payment", methods=["POST"])
+@require_auth
+@gateway_bound
+def initiate_payment():
+    try:
+        data = request.json or {}
+        # Client-supplied Idempotency-Key, else derived from the submitted form; always per user
+        user_id = current_user()["id"]
+        client_key = request.headers.get('Idempotency-Key', '').strip()
+        key = derive_key(user_id, client_key) if client_key else derive_key(user_id, data)
+
+        (body, status, order_id), replayed = payment_idempotency.run(
+            key, lambda: create_payment_order(data, user_id))
+
+        if order_id:
+            # The order lives in the payment_orders table; the cookie only references it
+            session['order_id'] = order_id
+        response = jsonify(body)
+        response.status_code = status
+        if replayed:
+            response.headers['Idempotent-Replayed'] = 'true'
+        return response
+
+    except GatewayUnavailable:
+        raise  # answered with 503 by gateway_bound
+    except GatewayError as e:
+        return jsonify({"success": False, "error": str(e)}), 502
+    except IdempotencyTimeout as e:
+        return jsonify({"success": False, "error": str(e)}), 409
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+# Students land on /payment-success after paying, so it is never shed like the other
+# gateway routes: it waits longer for a gateway slot, and if the gateway still can't be
+# asked it shows a page that retries by itself instead of a JSON error.
+PAYMENT_SUCCESS_GATEWAY_WAIT = float(os.getenv('PAYMENT_SUCCESS_GATEWAY_WAIT', '15'))
+
+def payment_retry_page(retry_after):
+    retry_after = max(int(retry_after), 2)
+    page = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><meta http-equiv="refresh" content="{retry_after}">
+<title>Confirming your payment</title></head>
+<body style="font-family: sans-serif; text-align: center; padding-top: 4em;">
+<h2>Confirming your payment&hellip;</h2>
+<p>Your payment was received. We could not reach the payment gateway to confirm it just now,
+so this page will try again in {retry_after} seconds. Please don't pay again.</p>
+</body></html>"""
+    response = Response(page, status=503, mimetype='text/html')
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
 # Route to handle successful payment redirect
 @app.route("/payment-success", methods=["GET", "POST"])
 def payment_success():
@@ -483,19 +742,25 @@ def payment_success():
         
         if not order_id:
             return "Payment verification failed. Order ID not found."
+
+        stored = db.get_payment_order(order_id)
+        if not stored["success"]:
+            return "Payment verification failed. Order not found. Please contact support."
+        # Never record or attach someone else's order to this session
+        if not order_belongs_to_request(stored["order"]):
+            return "This order belongs to another account. Please log in with the account that placed it.", 403
+        payment_request = stored["order"]["request"]
         
         # Verify payment with Cashfree API
-        headers = {
-            "x-client-id": CASHFREE_APP_ID,
-            "x-client-secret": CASHFREE_SECRET_KEY,
-            "x-api-version": "2023-08-01",
-            "Content-Type": "application/json"
-        }
-        
-        # Get order status from Cashfree
-        order_url = f"https://api.cashfree.com/pg/orders/{order_id}"
-        response = requests.get(order_url, headers=headers)
-        
+        try:
+            response = cashfree.get_order(order_id, wait=PAYMENT_SUCCESS_GATEWAY_WAIT)
+        except GatewayUnavailable as e:
+            return payment_retry_page(e.retry_after)
+        except GatewayError:
+            return payment_retry_page(5)
+        
+        if response.status_code >= 500:
+            return payment_retry_page(5)
         if response.status_code != 200:
             return f"Payment verification failed. API error: {response.text}"
         
@@ -503,12 +768,11 @@ def payment_success():
         order_status = order_data.get("order_status", "UNKNOWN")
         
         if order_status != "PAID":
+            db.update_payment_order(order_id, order_status)
             return f"Payment verification failed. Order status: {order_status}. Please contact support."
         
-        # Store payment data in session for use in index.html
-        session['payment_success'] = True
-        payment_request = session.get("payment_request", {})
-        session['payment_data'] = {
+        # Stored server-side for index.html (/api/payment-data) and PDF access
+        payment_data = {
             "order_id": order_id,
             "amount": order_data.get("order_amount", 1),
             "status": order_data.get("order_status", "PAID"),
@@ -539,6 +803,9 @@ def payment_success():
             "idCardPhoto": None,
             "signaturePhoto": None
         }
+        db.update_payment_order(order_id, order_status, payment_data)
+        session['payment_success'] = True
+        session['order_id'] = order_id
         
         # Redirect to index.html with payment success flag
         return redirect(f"/?payment_success=true&order_id={order_id}")
@@ -549,36 +816,48 @@ def payment_success():
 # Route to check payment status
 @app.route("/check-payment/<transaction_id>")
 def check_payment(transaction_id):
-    if not hasattr(app, 'payment_sessions'):
-        return jsonify({"success": False, "error": "No payment sessions"}), 404
-    
-    payment_session = app.payment_sessions.get(transaction_id)
-    if not payment_session:
+    order = order_for_request(transaction_id)
+    if not order:
         return jsonify({"success": False, "error": "Payment session not found"}), 404
     
     return jsonify({
         "success": True,
-        "payment": payment_session
+        "payment": {
+            "order_id": order["order_id"],
+            "status": order["status"],
+            "amount": order["amount"],
+            "courses": order["request"].get("courses", []),
+            "created_at": order["created_at"],
+            "updated_at": order["updated_at"]
+        }
     })
 
+# Signed webhooks older than this many seconds are refused (0 = no age limit). Gateway
+# retries can arrive hours later, and replaying a genuine event changes nothing.
+WEBHOOK_MAX_AGE = int(os.getenv('WEBHOOK_MAX_AGE', '86400'))
+
 @app.route("/payment-callback", methods=["POST"])
 def payment_callback():
-    try:
-        # Cashfree sends webhook data
-        data = request.json
-        
-        # Extract order information
-        order_id = data.get("order_id")
-        order_status = data.get("order_status")
-        
-        if order_status == "PAID":
-            return jsonify({"status": "success", "message": "Payment received. Allow PDF download."})
-        else:
-            return jsonify({"status": "failed", "message": "Payment not completed"})
-            
-    except Exception as e:
+    # Cashfree sends webhook data; store the raw body and acknowledge straight away.
+    # Status updates happen in webhook_processor, so a slow or failing update never
+    # makes the gateway retry (or time out) the delivery.
+    raw_body = request.get_data()
+    if not raw_body:
+        return jsonify({"status": "error", "message": "Empty webhook body"}), 400
+    # Only Cashfree knows the secret key: unsigned or forged bodies never reach the queue
+    if not verify_signature(CASHFREE_SECRET_KEY, request.headers.get(TIMESTAMP_HEADER),
+                            raw_body, request.headers.get(SIGNATURE_HEADER), max_age=WEBHOOK_MAX_AGE):
+        return jsonify({"status": "error", "message": "Invalid webhook signature"}), 401
+    payload = raw_body.decode('utf-8', errors='replace')
+
+    result = db.enqueue_webhook_event(order_id_of(payload), payload)
+    if not result["success"]:
+        # Not stored: a 500 makes the gateway redeliver later
         return jsonify({"status": "error", "message": "Webhook processing failed"}), 500
 
+    webhook_processor.notify()
+    return jsonify({"status": "success", "message": "Event queued"})
+
 @app.route("/payment-status", methods=["POST"])
 def payment_status():
     # This is the redirect page after payment
@@ -586,14 +865,15 @@ def payment_status():
 
 @app.route("/payment-status/<transaction_id>", methods=["GET"])
 def get_payment_status(transaction_id):
-    # Get payment data from session if available
-    payment_request = session.get('payment_request', {})
-    payment_data = session.get('payment_data', {})
+    order = order_for_request(transaction_id)
+    if not order:
+        return jsonify({"success": False, "error": "Order not found"}), 404
+    payment_request = order["request"]
     
     return jsonify({
         "success": True,
-        "status": "PAYMENT_SUCCESS",
-        "amount": payment_data.get("amount", 1),
+        "status": "PAYMENT_SUCCESS" if order["status"] == "PAID" else order["status"],
+        "amount": order["amount"],
         "courses": payment_request.get("courses", []) or payment_request.get("subjects", []),
         "userData": {
             "studentName": payment_request.get("studentName", "Not Provided"),
@@ -658,19 +938,13 @@ def debug_payment_error():
 
 # Test production authentication
 @app.route("/test-production-auth")
+@gateway_bound
 def test_production_auth():
     """Test authentication with production Cashfree API"""
     try:
-        headers = {
-            "x-client-id": CASHFREE_APP_ID,
-            "x-client-secret": CASHFREE_SECRET_KEY,
-            "x-api-version": "2023-08-01",
-            "Content-Type": "application/json"
-        }
-        
         # Try to get account info (this will fail if auth is wrong)
-        account_url = "https://api.cashfree.com/pg/merchants/me"
-        response = requests.get(account_url, headers=headers, timeout=10)
+        account_url = f"{cashfree.base_url}/merchants/me"
+        response = cashfree.get_merchant("me")
         
         return jsonify({
             "status_code": response.status_code,
@@ -683,6 +957,8 @@ def test_production_auth():
             }
         })
         
+    except GatewayUnavailable:
+        raise  # answered with 503 by gateway_bound
     except Exception as e:
         return jsonify({
             "status_code": "ERROR",
@@ -700,7 +976,7 @@ def get_pdf(course_code):
     """Secure route to serve PDFs only to paid users"""
     try:
         # Check if user has paid
-        payment_data = session.get('payment_data')
+        payment_data = session_payment_data()
         if not payment_data or payment_data.get("status") != "PAID":
             return jsonify({"success": False, "error": "Unauthorized access. Payment required."}), 403
         
@@ -776,7 +1052,7 @@ def get_pdf(course_code):
         if not os.path.exists(pdf_file):
             return jsonify({"success": False, "error": f"PDF file not found for course {course_code}"}), 404
 
-        return send_file(pdf_file, as_attachment=False, mimetype='application/pdf')
+        return send_hashed_file(os.path.abspath(pdf_file), request, mimetype='application/pdf', private=True)
         
     except Exception as e:
         return jsonify({"success": False, "error": "Internal server error"}), 500
@@ -832,9 +1108,9 @@ def verify_admin_session():
         if not admin_token:
             return jsonify({"success": False, "error": "No admin session"}), 401
         
-        result = db.verify_admin_session(admin_token)
-        if result["success"]:
-            return jsonify(result)
+        admin = current_admin()
+        if admin is not None:
+            return jsonify({"success": True, "admin": admin})
         else:
             session.pop('admin_token', None)
             session.pop('admin_data', None)
@@ -849,8 +1125,7 @@ def require_admin_auth(f):
         if not admin_token:
             return jsonify({"success": False, "error": "Admin authentication required"}), 401
         
-        result = db.verify_admin_session(admin_token)
-        if not result["success"]:
+        if current_admin() is None:
             session.pop('admin_token', None)
             session.pop('admin_data', None)
             return jsonify({"success": False, "error": "Admin session expired"}), 401
@@ -881,6 +1156,146 @@ def admin_statistics():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+# Payment gateway health: circuit breaker, calls in flight, latency per operation
+@app.route("/api/admin/gateway")
+@require_admin_auth
+def admin_gateway_status():
+    queue = db.get_webhook_queue_stats()
+    return jsonify({
+        "success": True,
+        "operations": cashfree.metrics.snapshot(),
+        **cashfree.status(),
+        "webhooks": {
+            **webhook_processor.snapshot(),
+            "pending": queue.get("pending"),
+            "oldest_pending": queue.get("oldest_pending")
+        },
+        "reconciliation": reconcile_schedule.snapshot()
+    })
+
+# Prometheus scrape endpoint; set METRICS_TOKEN to require "Authorization: Bearer <token>"
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+metrics.describe('app_waitress_threads', 'gauge', 'Waitress worker threads')
+metrics.describe('app_waitress_threads_busy', 'gauge', 'Waitress worker threads running a request')
+metrics.describe('app_waitress_queue_depth', 'gauge', 'Requests waiting for a free waitress thread')
+metrics.describe('app_cache_hits_total', 'counter', 'In-process cache hits')
+metrics.describe('app_cache_misses_total', 'counter', 'In-process cache misses (including expired entries)')
+metrics.describe('app_cache_hit_ratio', 'gauge', 'Hits / (hits + misses) since start')
+metrics.describe('app_cache_entries', 'gauge', 'Entries held by an in-process cache')
+metrics.describe('app_gateway_request_seconds', 'histogram', 'Cashfree call latency by operation (each attempt)', LATENCY_BUCKETS)
+metrics.describe('app_gateway_errors_total', 'counter', 'Cashfree calls that failed or returned 5xx')
+metrics.describe('app_gateway_retries_total', 'counter', 'Cashfree calls retried')
+metrics.describe('app_gateway_in_flight', 'gauge', 'Cashfree calls in progress')
+metrics.describe('app_gateway_rejected_total', 'counter', 'Cashfree calls refused by the in-flight limit')
+metrics.describe('app_gateway_circuit_state', 'gauge', '1 for the circuit breaker\'s current state')
+
+@metrics.collector
+def collect_waitress_metrics():
+    if waitress_tasks is None:
+        return []
+    return [
+        ('app_waitress_threads', (), len(waitress_tasks.threads)),
+        ('app_waitress_threads_busy', (), waitress_tasks.active_count),
+        ('app_waitress_queue_depth', (), len(waitress_tasks.queue)),
+    ]
+
+@metrics.collector
+def collect_cache_metrics():
+    caches = {
+        'session': db.session_cache,
+        'admin_session': db.admin_session_cache,
+        'order': db.order_cache,
+        'idempotency': payment_idempotency.completed,
+        'pdf_parsed': pdf_merger.parsed,
+        'pdf_output': pdf_merger.outputs,
+    }
+    samples = []
+    for name, cache in caches.items():
+        label = (('cache', name),)
+        hits, misses = cache.hits, cache.misses
+        samples += [
+            ('app_cache_hits_total', label, hits),
+            ('app_cache_misses_total', label, misses),
+            ('app_cache_hit_ratio', label, hits / (hits + misses) if hits + misses else 0.0),
+            ('app_cache_entries', label, len(cache)),
+        ]
+    return samples
+
+@metrics.collector
+def collect_gateway_metrics():
+    samples = []
+    for operation, (counts, total, errors, retries) in cashfree.metrics.histograms().items():
+        label = (('operation', operation),)
+        samples += histogram_samples('app_gateway_request_seconds', label, LATENCY_BUCKETS, counts, total)
+        samples += [('app_gateway_errors_total', label, errors), ('app_gateway_retries_total', label, retries)]
+    status = cashfree.status()
+    samples += [
+        ('app_gateway_in_flight', (), status['concurrency']['in_flight']),
+        ('app_gateway_rejected_total', (), status['concurrency']['rejected']),
+    ]
+    for state in ('closed', 'half_open', 'open'):
+        samples.append(('app_gateway_circuit_state', (('state', state),), int(status['breaker']['state'] == state)))
+    return samples
+
+@app.route("/metrics")
+def prometheus_metrics():
+    if METRICS_TOKEN and not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {METRICS_TOKEN}"):
+        return Response("Unauthorized\n", status=401, mimetype='text/plain')
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+# Sampling profiler across the waitress threads; returns collapsed stacks for
+# flamegraph.pl or speedscope. Holds this worker thread for the whole run.
+@app.route("/api/admin/profile")
+@require_admin_auth
+def admin_profile():
+    seconds = request.args.get('seconds', 10, type=float)
+    interval = request.args.get('interval', 0.01, type=float)
+    if not 0 < seconds <= PROFILE_MAX_SECONDS or not 0.001 <= interval <= 1:
+        return jsonify({
+            "success": False,
+            "error": f"seconds must be in (0, {PROFILE_MAX_SECONDS}] and interval in [0.001, 1]"
+        }), 400
+    if not profile_lock.acquire(blocking=False):
+        return jsonify({"success": False, "error": "A profile is already running"}), 409
+    try:
+        sampler = profile_threads(
+            seconds,
+            interval=interval,
+            prefix='' if request.args.get('threads') == 'all' else 'waitress-',
+            include_idle=request.args.get('idle') == '1'
+        )
+    finally:
+        profile_lock.release()
+    response = Response(sampler.collapsed(), mimetype='text/plain')
+    response.headers['X-Profile-Samples'] = str(sampler.samples)
+    response.headers['Content-Disposition'] = f'attachment; filename="profile-{int(time.time())}.folded"'
+    return response
+
+@app.route("/api/admin/profile/request-token", methods=["POST"])
+@require_admin_auth
+def admin_profile_request_token():
+    if not PROFILE_SECRET:
+        return jsonify({"success": False, "error": "Set PROFILE_SECRET to enable single-request profiling"}), 400
+    data = request.get_json(silent=True) or {}
+    method = str(data.get('method', 'GET')).upper()
+    path = data.get('path')
+    if not path or not str(path).startswith('/'):
+        return jsonify({"success": False, "error": "path is required, e.g. /api/courses"}), 400
+    ttl = min(max(int(data.get('ttl', 300)), 1), 3600)
+    value, expires = sign_request(PROFILE_SECRET, method, path, ttl)
+    return jsonify({"success": True, "header": PROFILE_HEADER, "value": value, "expires": expires})
+
+@app.route("/api/admin/profile/<profile_id>")
+@require_admin_auth
+def admin_profile_result(profile_id):
+    result = profile_results.get(profile_id)
+    if result is None:
+        return jsonify({"success": False, "error": "Profile not found or expired"}), 404
+    if request.args.get('format') == 'json':
+        return jsonify({"success": True, **result})
+    return Response(result["collapsed"], mimetype='text/plain')
+
 # Admin user management
 @app.route("/api/admin/users")
 @require_admin_auth
@@ -915,19 +1330,18 @@ def admin_update_user_status(user_id):
 @require_admin_auth
 def admin_get_assignments():
     try:
-        conn = sqlite3.connect(db.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT ua.id, u.name, u.email, ua.courses, ua.amount, ua.status, ua.created_at
-            FROM user_assignments ua
-            JOIN users u ON ua.user_id = u.id
-            ORDER BY ua.created_at DESC
-            LIMIT 100
-        ''')
-        
-        assignments = cursor.fetchall()
-        conn.close()
+        with db.pool.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT ua.id, u.name, u.email, ua.courses, ua.amount, ua.status, ua.created_at
+                FROM user_assignments ua
+                JOIN users u ON ua.user_id = u.id
+                ORDER BY ua.created_at DESC
+                LIMIT 100
+            ''')
+            
+            assignments = cursor.fetchall()
         
         return jsonify({
             "success": True,
@@ -1053,74 +1467,216 @@ def admin_add_program():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+# Uploaded course PDFs, indexed once at startup and kept current by the admin upload routes
+upload_index = UploadIndex('uploads', rescan_interval=float(os.getenv('UPLOAD_RESCAN_INTERVAL', '60')))
+upload_index.rescan()
+
+def resolve_course_pdf(course_code, medium):
+    """Find the uploaded PDF for a course code and medium ('english' or 'hindi').
+
+    Returns {"success": True, "pdf_path": <public URL>, "file_path": <path on disk>}
+    or {"success": False, "error": ..., "details": ...}.
+    """
+    # Support duplicates: all rows for this code (newest first) come from the catalog snapshot
+    courses_list = db.catalog.snapshot().courses_by_code(course_code)
+    if not courses_list:
+        return {"success": False, "error": "Course not found"}
+
+    # Choose course row based on medium-specific availability
+    chosen = None
+    if medium == 'hindi':
+        chosen = next((c for c in courses_list if c.get('pdf_filename_hi')), None)
+    elif medium == 'english':
+        chosen = next((c for c in courses_list if c.get('pdf_filename_en')), None)
+    if not chosen:
+        chosen = next((c for c in courses_list if c.get('pdf_filename')), courses_list[0])
+
+    course = chosen
+    # Priority: medium-specific > default
+    filename = None
+    if medium == 'hindi' and course.get('pdf_filename_hi'):
+        filename = course['pdf_filename_hi']
+    elif medium == 'english' and course.get('pdf_filename_en'):
+        filename = course['pdf_filename_en']
+    elif course.get('pdf_filename'):
+        filename = course['pdf_filename']
+    if not filename:
+        return {"success": False, "error": "No PDF filename configured for this course"}
+    # Ensure .pdf extension if missing
+    if '.' not in os.path.basename(filename):
+        filename = filename + ".pdf"
+
+    program = course.get('program') or ''
+    program_folder = program.upper().replace('.', '').replace(' ', '')
+
+    # Only allow PDFs that were uploaded via admin panel (uploads folder). No legacy fallbacks.
+    # Looked up in the upload index (program folder first, then the medium root), not on disk.
+    # Paths are content-addressed (?v=<hash>) so browsers can cache the PDF indefinitely
+    if medium in ('english', 'hindi'):
+        entry = upload_index.get(medium, f"{program_folder}/{filename}") or upload_index.get(medium, filename)
+        if entry is not None:
+            return {
+                "success": True,
+                "pdf_path": versioned_url(entry.public_url, entry.path, stat=entry.stat),
+                "file_path": entry.path
+            }
+
+    # If after all fallbacks nothing found for a specified medium, report clearly
+    missing_for = 'English' if medium == 'english' else ('Hindi' if medium == 'hindi' else 'the requested')
+    return {
+        "success": False,
+        "error": f"{missing_for} PDF not found for course {course_code}",
+        "details": {
+            "course_code": course_code,
+            "program": course.get('program'),
+            "expected_filename": filename
+        }
+    }
+
 # Resolve PDF filename(s) for a given course code and medium
 @app.route("/api/course-material/<course_code>")
 def resolve_course_material(course_code):
     try:
         medium = request.args.get('medium', '').lower()  # 'english' or 'hindi'
-        # Support duplicates: fetch all rows for this code and pick best match
-        multi = getattr(db, 'get_courses_by_code_all', None)
-        courses_list = []
-        if callable(multi):
-            res_all = db.get_courses_by_code_all(course_code)
-            if res_all.get('success'):
-                courses_list = res_all.get('courses', [])
-        if not courses_list:
-            single = db.get_course_by_code(course_code)
-            if not single.get('success'):
-                return jsonify(single), 404
-            courses_list = [single['course']]
-
-        # Choose course row based on medium-specific availability
-        chosen = None
-        if medium == 'hindi':
-            chosen = next((c for c in courses_list if c.get('pdf_filename_hi')), None)
-        elif medium == 'english':
-            chosen = next((c for c in courses_list if c.get('pdf_filename_en')), None)
-        if not chosen:
-            chosen = next((c for c in courses_list if c.get('pdf_filename')), courses_list[0])
-
-        course = chosen
-        # Priority: medium-specific > default
-        filename = None
-        if medium == 'hindi' and course.get('pdf_filename_hi'):
-            filename = course['pdf_filename_hi']
-        elif medium == 'english' and course.get('pdf_filename_en'):
-            filename = course['pdf_filename_en']
-        elif course.get('pdf_filename'):
-            filename = course['pdf_filename']
-        if not filename:
-            return jsonify({"success": False, "error": "No PDF filename configured for this course"}), 404
-        # Ensure .pdf extension if missing
-        if '.' not in os.path.basename(filename):
-            filename = filename + ".pdf"
-
-        pdf_path = None
-        program = course.get('program') or ''
-        program_folder = program.upper().replace('.', '').replace(' ', '')
-
-        # Only allow PDFs that were uploaded via admin panel (uploads folder). No legacy fallbacks.
-        if medium in ('english', 'hindi'):
-            upload_candidate_program = os.path.join('uploads', medium, program_folder, filename)
-            upload_candidate_root = os.path.join('uploads', medium, filename)
-            if os.path.exists(upload_candidate_program):
-                pdf_path = f"/uploads/{medium}/{program_folder}/{filename}"
-            elif os.path.exists(upload_candidate_root):
-                pdf_path = f"/uploads/{medium}/{filename}"
-
-        # If after all fallbacks nothing found for a specified medium, report clearly
-        if not pdf_path:
-            missing_for = 'English' if medium == 'english' else ('Hindi' if medium == 'hindi' else 'the requested')
-            return jsonify({
-                "success": False,
-                "error": f"{missing_for} PDF not found for course {course_code}",
-                "details": {
-                    "course_code": course_code,
-                    "program": course.get('program'),
-                    "expected_filename": filename
-                }
-            }), 404
-        return jsonify({"success": True, "pdf_path": pdf_path})
+        result = resolve_course_pdf(course_code, medium)
+        if not result["success"]:
+            return jsonify(result), 404
+        return jsonify({"success": True, "pdf_path": result["pdf_path"]})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+MAX_BATCH_COURSES = 50
+
+# Resolve many course codes for one medium in a single round trip
+@app.route("/api/course-material")
+def resolve_course_materials():
+    try:
+        medium = request.args.get('medium', '').lower()  # 'english' or 'hindi'
+        course_codes = [c.strip() for c in request.args.get('codes', '').split(',') if c.strip()]
+        if not course_codes:
+            return jsonify({"success": False, "error": "codes is required"}), 400
+        if len(course_codes) > MAX_BATCH_COURSES:
+            return jsonify({"success": False, "error": f"At most {MAX_BATCH_COURSES} codes per request"}), 400
+
+        # Every lookup is served from the catalog snapshot, so N codes cost no SQL at all
+        materials = {}
+        for course_code in dict.fromkeys(course_codes):
+            result = resolve_course_pdf(course_code, medium)
+            if result["success"]:
+                materials[course_code] = {"success": True, "pdf_path": result["pdf_path"]}
+            else:
+                materials[course_code] = result
+        return jsonify({"success": True, "medium": medium, "materials": materials})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+# Parsed course PDFs are shared across requests; see pdf_merge.py
+pdf_merger = PdfMerger()
+MAX_COVER_BYTES = 5 * 1024 * 1024
+MAX_MERGE_COURSES = 20
+
+# Merge the generated cover sheet with the course PDFs server-side
+@app.route("/api/merge-pdf", methods=["POST"])
+@require_auth
+def merge_pdf():
+    try:
+        cover = request.files.get('cover')
+        if cover is None:
+            return jsonify({"success": False, "error": "Cover PDF is required"}), 400
+        cover_bytes = cover.read(MAX_COVER_BYTES + 1)
+        if len(cover_bytes) > MAX_COVER_BYTES:
+            return jsonify({"success": False, "error": "Cover PDF is too large"}), 413
+
+        medium = request.form.get('medium', '').lower()  # 'english' or 'hindi'
+        course_codes = [c.strip() for c in request.form.get('courses', '').split(',') if c.strip()]
+        if len(course_codes) > MAX_MERGE_COURSES:
+            return jsonify({"success": False, "error": f"At most {MAX_MERGE_COURSES} courses can be merged"}), 400
+
+        materials = []
+        missing = []
+        for course_code in course_codes:
+            result = resolve_course_pdf(course_code, medium)
+            if result["success"]:
+                materials.append((course_code, medium, result["file_path"]))
+            else:
+                missing.append(course_code)
+
+        try:
+            merged = pdf_merger.merge(cover_bytes, materials)
+        except PdfReadError as e:
+            return jsonify({"success": False, "error": f"Invalid PDF: {e}"}), 400
+
+        response = send_file(io.BytesIO(merged), mimetype='application/pdf',
+                             download_name='assignment.pdf', max_age=0)
+        response.cache_control.private = True
+        if missing:
+            # The client still gets the cover plus whatever was found
+            response.headers['X-Missing-Courses'] = ','.join(missing)
+        return response
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+# Stream every course PDF of an order as one ZIP (entries are STORED, sent as they are built)
+@app.route("/api/download-zip", methods=["POST"])
+@require_auth
+def download_zip():
+    try:
+        medium = request.form.get('medium', '').lower()  # 'english' or 'hindi'
+        course_codes = [c.strip() for c in request.form.get('courses', '').split(',') if c.strip()]
+        if not course_codes:
+            return jsonify({"success": False, "error": "No courses requested"}), 400
+        if len(course_codes) > MAX_MERGE_COURSES:
+            return jsonify({"success": False, "error": f"At most {MAX_MERGE_COURSES} courses can be zipped"}), 400
+
+        # Optional cover sheet per course, uploaded as cover_<course_code>
+        covers = {}
+        for course_code in course_codes:
+            cover = request.files.get(f'cover_{course_code}')
+            if cover is not None:
+                cover_bytes = cover.read(MAX_COVER_BYTES + 1)
+                if len(cover_bytes) > MAX_COVER_BYTES:
+                    return jsonify({"success": False, "error": f"Cover PDF for {course_code} is too large"}), 413
+                covers[course_code] = cover_bytes
+
+        # Resolve everything up front so missing courses can be reported in the headers
+        materials = {}
+        missing = []
+        for course_code in course_codes:
+            result = resolve_course_pdf(course_code, medium)
+            if result["success"]:
+                materials[course_code] = result["file_path"]
+            else:
+                missing.append(course_code)
+
+        date = time.strftime('%Y-%m-%d')
+
+        def entries():
+            # Merges run lazily, one entry at a time, while earlier entries are already on the wire
+            for course_code in course_codes:
+                arcname = secure_filename(f"Assignment_{course_code}_{date}.pdf")
+                cover_bytes = covers.get(course_code)
+                file_path = materials.get(course_code)
+                if cover_bytes and file_path:
+                    try:
+                        yield arcname, pdf_merger.merge(cover_bytes, [(course_code, medium, file_path)])
+                    except PdfReadError:
+                        yield arcname, file_path
+                elif file_path:
+                    yield arcname, file_path
+                elif cover_bytes:
+                    yield arcname, cover_bytes
+
+        # No Content-Length, so the WSGI server sends it with chunked transfer encoding
+        response = Response(stream_zip(entries()), mimetype='application/zip')
+        # The page names the download; form posts cannot set link.download
+        zip_name = secure_filename(request.form.get('filename', ''))
+        if not zip_name.lower().endswith('.zip'):
+            zip_name = f"Assignments_{date}.zip"
+        response.headers['Content-Disposition'] = f'attachment; filename="{zip_name}"'
+        response.headers['Cache-Control'] = 'private, no-store'
+        if missing:
+            response.headers['X-Missing-Courses'] = ','.join(missing)
+        return response
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -1144,8 +1700,8 @@ def admin_upload_file():
             return jsonify({"success": False, "error": "Invalid filename"}), 400
         save_path = os.path.join(dest_dir, filename)
         f.save(save_path)
-        public_path = f"/uploads/{medium}/{subfolder + '/' if subfolder else ''}{filename}"
-        return jsonify({"success": True, "path": public_path})
+        entry = upload_index.add(medium, f"{subfolder + '/' if subfolder else ''}{filename}")
+        return jsonify({"success": True, "path": entry.public_url})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -1156,20 +1712,7 @@ def admin_list_uploads():
         medium = (request.args.get('medium') or '').lower()
         if medium not in ('english', 'hindi'):
             return jsonify({"success": False, "error": "medium must be 'english' or 'hindi'"}), 400
-        base_dir = os.path.join('uploads', medium)
-        files = []
-        for root, _, filenames in os.walk(base_dir):
-            for name in filenames:
-                rel = os.path.relpath(os.path.join(root, name), base_dir).replace('\\', '/')
-                full_path = os.path.join(root, name)
-                stat = os.stat(full_path)
-                files.append({
-                    'name': name,
-                    'relative_path': rel,
-                    'public_url': f"/uploads/{medium}/{rel}",
-                    'size': stat.st_size,
-                    'modified': stat.st_mtime
-                })
+        files = [entry.to_dict() for entry in upload_index.list(medium)]
         return jsonify({"success": True, "files": files})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -1198,6 +1741,7 @@ def admin_delete_upload():
             return jsonify({"success": False, "error": "File not found"}), 404
         
         os.remove(full_path)
+        upload_index.remove(medium, file_path)
         return jsonify({"success": True, "message": "File deleted successfully"})
         
     except Exception as e:
@@ -1238,6 +1782,8 @@ def admin_rename_upload():
         
         # Return new relative path
         new_relative_path = os.path.relpath(new_full_path, os.path.join('uploads', medium)).replace('\\', '/')
+        upload_index.remove(medium, old_path)
+        upload_index.add(medium, new_relative_path)
         
         return jsonify({
             "success": True, 
@@ -1320,8 +1866,9 @@ def get_filtered_courses():
         year = request.args.get('year')
         semester = request.args.get('semester')
         
-        result = db.get_courses_by_filter(program=program, year=year, semester=semester)
-        return jsonify(result)
+        # Served from the in-memory catalog: a dict lookup returning pre-serialized JSON
+        body = db.catalog.snapshot().filter_json(program=program, year=year, semester=semester)
+        return app.response_class(body, mimetype='application/json')
         
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
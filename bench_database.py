@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Benchmark for every Database method at production scale
+Seeds a throwaway SQLite file through generate_data.py (users, sessions, orders with
+their assignments, courses and study centers), then times each Database method cold
+(fresh connections, empty in-process caches) and warm (repeated calls), with the SQL
+statements per call.
+
+Usage: python bench_database.py [--preset small|medium|large] [--users N] [--sessions N]
+                                [--orders N] [--courses N] [--centers N]
+                                [--db bench.db] [--reuse] [--repeat 50] [--only login,verify]
+                                [--out bench_database.json]
+
+Presets are generate_data.py's; --preset large is 2M users, 8M sessions and 10M orders
+(several GB on disk; seeding takes several minutes). Users, sessions, orders and courses
+to call methods with are sampled from the database, so --reuse works on any database
+generate_data.py filled. Cold timings still hit the OS page cache; drop it yourself
+(e.g. `echo 3 > /proc/sys/vm/drop_caches`) for disk-cold numbers.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from generate_data import PASSWORD, PRESETS, PROGRAMS, YEARS, generate
+
+
+def sample_rows(database, table, sql, count, rng):
+    """Rows of `sql` (which ends in `WHERE <table>.rowid IN`) for up to `count` random rowids"""
+    with database.pool.connection() as conn:
+        top = conn.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {table}").fetchone()[0]
+        rowids = rng.sample(range(1, top + 1), min(count, top))
+        return conn.execute(f"{sql} ({','.join('?' * len(rowids))})", rowids).fetchall()
+
+
+def sample_fixtures(database, rng, count=2000):
+    """Existing emails, session tokens, order ids and course codes to call methods with"""
+    sessions = sample_rows(database, "user_sessions", '''
+        SELECT s.session_token, s.expires_at > CURRENT_TIMESTAMP AND u.is_active = 1
+        FROM user_sessions s JOIN users u ON u.id = s.user_id WHERE s.rowid IN
+    ''', count * 5, rng)
+    fixtures = {
+        "emails": [row[0] for row in sample_rows(
+            database, "users", "SELECT email FROM users WHERE is_active = 1 AND rowid IN", count, rng)],
+        "live_sessions": [token for token, live in sessions if live],
+        "expired_sessions": [token for token, live in sessions if not live],
+        "orders": [row[0] for row in sample_rows(
+            database, "payment_orders", "SELECT order_id FROM payment_orders WHERE rowid IN", count, rng)],
+        "courses": [row[0] for row in sample_rows(
+            database, "courses", "SELECT course_code FROM courses WHERE rowid IN", count, rng)],
+    }
+    empty = [name for name, values in fixtures.items() if not values]
+    if empty:
+        sys.exit(f"❌ Not enough data to benchmark with (no {', '.join(empty)}); seed a larger preset")
+    return fixtures
+
+
+def reset_caches(database):
+    """Make the next call cold: new SQLite connections and empty in-process caches"""
+    from catalog import CourseCatalog
+
+    database.pool.close_all()
+    database.session_cache.clear()
+    database.admin_session_cache.clear()
+    database.order_cache.clear()
+    database.catalog = CourseCatalog(database)
+
+
+def build_benchmarks(database, scale, rng, run_id):
+    """(name, call(i)[, expect_success]) tuples covering every public Database method"""
+    users = max(scale["users"], 1)
+    fixtures = sample_fixtures(database, rng)
+    admin_token = database.login_admin("admin", "admin123")["session_token"]
+    login_tokens = []
+    course_ids = []
+    center_ids = []
+
+    def user_email(i):
+        return rng.choice(fixtures["emails"])
+
+    def session_token(i):
+        return rng.choice(fixtures["live_sessions"])
+
+    def order_id(i):
+        return rng.choice(fixtures["orders"])
+
+    def login(i):
+        result = database.login_user(user_email(i), PASSWORD)
+        if result["success"]:
+            login_tokens.append(result["session_token"])
+        return result
+
+    def logout(i):
+        return database.logout_user(login_tokens.pop() if login_tokens else f"missing-{i}")
+
+    def new_course(i):
+        result = database.add_course(f"BX{run_id}{i:05d}", "Bench Added", "MBA", "1st Year", "Yearly")
+        course_ids.append(result.get("course_id"))
+        return result
+
+    def new_center(i):
+        result = database.add_study_center(f"BX{run_id}{i:05d}", "Bench Added", "1 Bench Road", "Delhi", "Delhi")
+        center_ids.append(result.get("center_id"))
+        return result
+
+    return [
+        ("hash_password", lambda i: database.hash_password(PASSWORD)),
+        ("register_user", lambda i: database.register_user(
+            "Bench New", f"new-{run_id}-{i}@bench.example", f"5{run_id}{i:05d}", PASSWORD)),
+        ("login_user", login),
+        ("verify_session (cached)", lambda i: database.verify_session(fixtures["live_sessions"][0])),
+        ("verify_session (uncached)", lambda i: database.verify_session(session_token(i))),
+        ("verify_session (expired)", lambda i: database.verify_session(rng.choice(fixtures["expired_sessions"])),
+         False),
+        ("logout_user", logout),
+        ("save_assignment_request", lambda i: database.save_assignment_request(
+            rng.randint(1, users), ["MMPC-001", "MMPC-002"], f"ORDX{run_id}{i:08d}", 2)),
+        ("create_payment_order", lambda i: database.create_payment_order(
+            f"ORDY{run_id}{i:08d}", rng.randint(1, users), 2, {"courses": ["MMPC-001", "MMPC-002"]})),
+        ("get_payment_order (cached)", lambda i: database.get_payment_order(f"ORDY{run_id}{0:08d}")),
+        ("get_payment_order (uncached)", lambda i: database.get_payment_order(order_id(i))),
+        ("update_payment_order", lambda i: database.update_payment_order(order_id(i), "PAID", {"status": "PAID"})),
+        ("enqueue_webhook_event", lambda i: database.enqueue_webhook_event(
+            order_id(i), json.dumps({"order_id": order_id(i), "order_status": "PAID"}))),
+        ("claim_webhook_events", lambda i: database.claim_webhook_events(100)),
+        ("apply_webhook_batch", lambda i: database.apply_webhook_batch(
+            {order_id(i): "PAID" for _ in range(50)}, [])),
+        ("apply_order_statuses", lambda i: database.apply_order_statuses({order_id(i): "EXPIRED" for _ in range(50)})),
+        ("get_pending_order_ids", lambda i: database.get_pending_order_ids(rng.randrange(max(scale["orders"], 1)), 500)),
+        ("get_webhook_queue_stats", lambda i: database.get_webhook_queue_stats()),
+        ("register_admin", lambda i: database.register_admin(
+            f"bench{run_id}{i}", f"bench{run_id}{i}@bench.example", PASSWORD, "Bench Admin")),
+        ("login_admin", lambda i: database.login_admin("admin", "admin123")),
+        ("verify_admin_session", lambda i: database.verify_admin_session(admin_token)),
+        ("logout_admin", lambda i: database.logout_admin(f"missing-admin-{i}")),
+        ("get_all_users (first page)", lambda i: database.get_all_users(limit=50, offset=0)),
+        ("get_all_users (deep page)", lambda i: database.get_all_users(limit=50, offset=max(users - 100, 0))),
+        ("update_user_status", lambda i: database.update_user_status(rng.randint(1, users), 1)),
+        ("get_assignment_statistics", lambda i: database.get_assignment_statistics()),
+        ("create_default_admin", lambda i: database.create_default_admin()),
+        ("add_course", new_course),
+        ("get_all_courses", lambda i: database.get_all_courses(limit=50, offset=0)),
+        ("get_courses_by_filter", lambda i: database.get_courses_by_filter(
+            program=rng.choice(list(PROGRAMS)), year=rng.choice(YEARS))),
+        ("get_courses_by_filter (with inactive)", lambda i: database.get_courses_by_filter(
+            program=rng.choice(list(PROGRAMS)), is_active=None)),
+        ("update_course", lambda i: database.update_course(course_ids[i % len(course_ids)], course_name=f"Bench Renamed {i}")),
+        ("get_catalog_version", lambda i: database.get_catalog_version()),
+        ("load_course_catalog", lambda i: database.load_course_catalog()),
+        ("get_course_by_code", lambda i: database.get_course_by_code(rng.choice(fixtures["courses"]))),
+        ("get_courses_by_code_all", lambda i: database.get_courses_by_code_all("MMPC-001")),
+        ("add_study_center", new_center),
+        ("get_study_centers", lambda i: database.get_study_centers(limit=50, offset=0)),
+        ("update_study_center", lambda i: database.update_study_center(center_ids[i % len(center_ids)], name=f"Bench Renamed {i}")),
+        ("add_program", lambda i: database.add_program(f"BP{run_id}{i}", f"Bench Program {i}")),
+        ("get_all_programs", lambda i: database.get_all_programs()),
+        ("initialize_default_data", lambda i: database.initialize_default_data()),
+        ("delete_course", lambda i: database.delete_course(course_ids.pop())),
+        ("delete_study_center", lambda i: database.delete_study_center(center_ids.pop())),
+    ]
+
+
+def time_call(database, call, i):
+    database.query_stats.reset()
+    start = time.perf_counter()
+    result = call(i)
+    elapsed = time.perf_counter() - start
+    ok = not (isinstance(result, dict) and result.get("success") is False)
+    return elapsed, database.query_stats.count, ok
+
+
+def run_benchmarks(database, benchmarks, repeat):
+    results = {}
+    for name, call, *expect in benchmarks:
+        expect_success = expect[0] if expect else True
+        reset_caches(database)
+        cold, cold_queries, cold_ok = time_call(database, call, 0)
+        samples = []
+        queries = []
+        failures = 0 if cold_ok == expect_success else 1
+        for i in range(1, repeat + 1):
+            elapsed, count, ok = time_call(database, call, i)
+            samples.append(elapsed)
+            queries.append(count)
+            failures += 0 if ok == expect_success else 1
+        samples.sort()
+        results[name] = {
+            "cold_ms": round(cold * 1000, 3),
+            "cold_queries": cold_queries,
+            "warm_p50_ms": round(statistics.median(samples) * 1000, 3),
+            "warm_p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 3),
+            "warm_max_ms": round(samples[-1] * 1000, 3),
+            "warm_queries": round(statistics.mean(queries), 2),
+            "calls": repeat + 1,
+            "unexpected_results": failures,
+        }
+        r = results[name]
+        flag = f"  ⚠️ {failures} unexpected results" if failures else ""
+        print(f"{name:<40}{r['cold_ms']:>11.2f}{r['warm_p50_ms']:>11.3f}{r['warm_p95_ms']:>11.3f}"
+              f"{r['warm_queries']:>8}{flag}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every Database method at scale")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    for table in PRESETS["small"]:
+        parser.add_argument(f"--{table}", type=int, default=None, help=f"override the preset's {table} count")
+    parser.add_argument("--db", default=None, help="database file (default: a temporary file)")
+    parser.add_argument("--reuse", action="store_true", help="benchmark an existing --db without seeding")
+    parser.add_argument("--repeat", type=int, default=50, help="warm calls per method")
+    parser.add_argument("--only", default=None, help="comma-separated substrings of method names to run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="bench_database.json")
+    args = parser.parse_args()
+
+    scale = dict(PRESETS[args.preset])
+    for table in scale:
+        if getattr(args, table) is not None:
+            scale[table] = getattr(args, table)
+
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="bench-db-"), "bench.db")
+    # database.py opens DATABASE_PATH on import; keep it off the real users.db
+    os.environ["DATABASE_PATH"] = path
+    rng = random.Random(args.seed)
+
+    seeding = None
+    if args.reuse:
+        if not os.path.exists(path):
+            sys.exit(f"❌ --reuse given but {path} does not exist")
+        print(f"♻️  Reusing {path}")
+    else:
+        if os.path.exists(path):
+            sys.exit(f"❌ {path} already exists; pass --reuse or choose another --db")
+        print(f"🗄️  Seeding {path}: " + ", ".join(f"{k}={v:,}" for k, v in scale.items()))
+        _, seeding = generate(path, scale, rng)
+
+    from database import Database
+
+    start = time.perf_counter()
+    database = Database(path)
+    startup_ms = round((time.perf_counter() - start) * 1000, 1)
+    print(f"🚀 Database() startup (schema checks, migrations): {startup_ms} ms")
+
+    run_id = f"{int(time.time()) % 100000:05d}"
+    benchmarks = build_benchmarks(database, scale, rng, run_id)
+    if args.only:
+        wanted = [w.strip() for w in args.only.split(",") if w.strip()]
+        benchmarks = [b for b in benchmarks if any(w in b[0] for w in wanted)]
+
+    print(f"{'method':<40}{'cold ms':>11}{'p50 ms':>11}{'p95 ms':>11}{'queries':>8}")
+    results = run_benchmarks(database, benchmarks, args.repeat)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "database": path,
+        "database_bytes": os.path.getsize(path),
+        "scale": scale,
+        "repeat": args.repeat,
+        "seeding": seeding,
+        "startup_ms": startup_ms,
+        "environment": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "methods": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
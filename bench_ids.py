@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the order ID generator in ids.py
+Measures single-thread and multi-thread throughput and checks every ID is unique,
+including IDs generated by several worker processes with distinct node ids.
+
+Usage: python bench_ids.py [--count 2000000] [--threads 8] [--processes 4]
+"""
+
+import argparse
+import multiprocessing
+import threading
+import time
+
+from ids import SnowflakeGenerator, parse_id
+
+
+def bench_single_thread(count):
+    generator = SnowflakeGenerator(node_id=1)
+    next_id = generator.next_id
+    start = time.perf_counter()
+    ids = [next_id() for _ in range(count)]
+    elapsed = time.perf_counter() - start
+    assert len(set(ids)) == count, "duplicate IDs"
+    assert ids == sorted(ids), "IDs are not monotonic"
+    return count / elapsed, ids
+
+
+def bench_batched(count, batch_size=10000):
+    generator = SnowflakeGenerator(node_id=3)
+    start = time.perf_counter()
+    ids = []
+    for _ in range(count // batch_size):
+        ids.extend(generator.next_ids(batch_size))
+    elapsed = time.perf_counter() - start
+    assert len(set(ids)) == len(ids), "duplicate IDs"
+    assert ids == sorted(ids), "IDs are not monotonic"
+    return len(ids) / elapsed
+
+
+def bench_threads(count, threads):
+    generator = SnowflakeGenerator(node_id=2)
+    per_thread = count // threads
+    results = [None] * threads
+
+    def worker(slot):
+        next_id = generator.next_id
+        results[slot] = [next_id() for _ in range(per_thread)]
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    all_ids = [i for chunk in results for i in chunk]
+    assert len(set(all_ids)) == len(all_ids), "duplicate IDs across threads"
+    return len(all_ids) / elapsed
+
+
+def _process_worker(args):
+    node_id, count = args
+    generator = SnowflakeGenerator(node_id=node_id)
+    return generator.next_ids(count)
+
+
+def bench_processes(count, processes):
+    per_process = count // processes
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        chunks = pool.map(_process_worker, [(node_id, per_process) for node_id in range(processes)])
+    elapsed = time.perf_counter() - start
+    all_ids = [i for chunk in chunks for i in chunk]
+    assert len(set(all_ids)) == len(all_ids), "duplicate IDs across processes"
+    return len(all_ids) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Snowflake order ID generator")
+    parser.add_argument("--count", type=int, default=2000000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"🔢 Generating {args.count:,} IDs per scenario")
+
+    rate, ids = bench_single_thread(args.count)
+    first_ms, _, _ = parse_id(ids[0])
+    last_ms, _, _ = parse_id(ids[-1])
+    print(f"✅ 1 thread:        {rate:>12,.0f} IDs/s (unique, monotonic; spans {last_ms - first_ms} ms of ID time)")
+
+    rate = bench_batched(args.count)
+    print(f"✅ 1 thread, batch: {rate:>12,.0f} IDs/s (next_ids(10000); unique, monotonic)")
+
+    rate = bench_threads(args.count, args.threads)
+    print(f"✅ {args.threads} threads:       {rate:>12,.0f} IDs/s (unique)")
+
+    rate = bench_processes(args.count, args.processes)
+    print(f"✅ {args.processes} processes:     {rate:>12,.0f} IDs/s (next_ids; unique across node ids, includes pool start-up)")
+
+    sample = SnowflakeGenerator(node_id=1).next_order_id()
+    print(f"📋 Sample order id: {sample} ({len(sample)} chars)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import json
+import threading
+import time
+
+# Filter combinations memoised per snapshot; arbitrary query strings beyond this are computed on the fly
+MAX_CACHED_FILTERS = 2048
+
+
+def _to_json_bytes(payload):
+    # Same compact encoding Flask's jsonify uses outside debug mode
+    return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+class CatalogSnapshot:
+    """Immutable view of the courses table at one catalog version.
+
+    Active courses are indexed by (program, year, semester) with the response
+    body for /api/courses/filter already serialized; every course row (active
+    or not) is indexed by course_code, newest first.
+    """
+
+    def __init__(self, version, rows):
+        self.version = version
+        courses = tuple(sorted(rows, key=lambda c: (c["course_code"], c["id"])))
+        self.active = tuple(c for c in courses if c["is_active"] == 1)
+
+        by_code = {}
+        for course in sorted(rows, key=lambda c: (c["updated_at"] or "", c["created_at"] or ""), reverse=True):
+            by_code.setdefault(course["course_code"], []).append(course)
+        self.by_code = {code: tuple(items) for code, items in by_code.items()}
+
+        self._filter_cache = {}
+        # Pre-serialize every combination the form can actually produce
+        for course in self.active:
+            program, year, semester = course["program"], course["year"], course["semester"] or "Yearly"
+            for key in ((program, None, None), (program, year or None, None),
+                        (program, None, semester), (program, year or None, semester)):
+                self.filter_json(*key)
+
+    @staticmethod
+    def _matches(course, program, year, semester):
+        if program and course["program"] != program:
+            return False
+        if year and course["year"] != year:
+            return False
+        if semester:
+            if semester == "Yearly":
+                # Yearly courses may be saved with an empty semester
+                return course["semester"] in ("Yearly", "")
+            return course["semester"] == semester
+        return True
+
+    def filter_courses(self, program=None, year=None, semester=None):
+        """Active courses matching the filter, ordered by course code"""
+        return [c for c in self.active if self._matches(c, program, year, semester)]
+
+    def filter_json(self, program=None, year=None, semester=None):
+        """Serialized /api/courses/filter response body for the given filter"""
+        key = (program or None, year or None, semester or None)
+        body = self._filter_cache.get(key)
+        if body is None:
+            courses = [_public_fields(c) for c in self.filter_courses(*key)]
+            body = _to_json_bytes({"success": True, "courses": courses})
+            if len(self._filter_cache) < MAX_CACHED_FILTERS:
+                self._filter_cache[key] = body
+        return body
+
+    def courses_by_code(self, course_code):
+        """All rows for a course code, newest first (same order as get_courses_by_code_all)"""
+        return self.by_code.get(course_code, ())
+
+
+def _public_fields(course):
+    return {k: v for k, v in course.items() if k != "updated_at"}
+
+
+class CourseCatalog:
+    """In-memory course catalog that follows the catalog_version row in SQLite.
+
+    Writers in this process call refresh() right after committing, which swaps
+    in a freshly built snapshot. Changes made by other processes are picked up
+    by re-reading the version row at most once per `check_interval` seconds.
+    """
+
+    def __init__(self, db, check_interval=1.0):
+        self.db = db
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._refresh_lock = threading.Lock()
+
+    def snapshot(self):
+        current = self._snapshot
+        if current is None:
+            return self.refresh()
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            # Only one thread checks; the others keep serving the current snapshot
+            if self._refresh_lock.acquire(blocking=False):
+                try:
+                    self._checked_at = time.monotonic()
+                    if self.db.get_catalog_version() != current.version:
+                        self._rebuild()
+                except Exception:
+                    pass
+                finally:
+                    self._refresh_lock.release()
+        return self._snapshot
+
+    def refresh(self):
+        """Rebuild the snapshot from the database and swap it in atomically"""
+        with self._refresh_lock:
+            return self._rebuild()
+
+    def _rebuild(self):
+        version, rows = self.db.load_course_catalog()
+        snapshot = CatalogSnapshot(version, rows)
+        self._snapshot = snapshot
+        self._checked_at = time.monotonic()
+        return snapshot
@@ -0,0 +1,11 @@
+"""
+Shared test setup. database.py opens DATABASE_PATH as soon as it is imported and
+app.py starts webhook workers, so both are pointed away from any real deployment
+before a test file imports them, whatever the shell exports.
+"""
+
+import os
+import tempfile
+
+os.environ["DATABASE_PATH"] = os.path.join(tempfile.mkdtemp(), "test_users.db")
+os.environ["WEBHOOK_WORKERS"] = "0"
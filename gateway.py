@@ -0,0 +1,304 @@
+import bisect
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import LATENCY_BUCKETS
+
+CASHFREE_API_VERSION = "2023-08-01"
+
+# Gateway replies worth retrying for idempotent calls
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class GatewayError(Exception):
+    """The gateway could not be reached or did not answer in time"""
+
+
+class GatewayUnavailable(GatewayError):
+    """Call refused without touching the network (circuit open or too many calls in flight)"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Closed -> open after `failure_threshold` consecutive failures.
+
+    While open every call is refused for `reset_timeout` seconds. The breaker
+    then goes half-open and lets a single trial call through: success closes
+    it, failure opens it again for another `reset_timeout`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._times_opened = 0
+        self._lock = threading.Lock()
+
+    def _retry_after(self):
+        return max(1, int(self._opened_at + self.reset_timeout - time.monotonic() + 0.999))
+
+    def before_call(self):
+        """Raise GatewayUnavailable unless a call may go through now"""
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise GatewayUnavailable("Payment gateway circuit is open", self._retry_after())
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    raise GatewayUnavailable("Payment gateway is being probed", 1)
+                self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def snapshot(self):
+        with self._lock:
+            state = self._state
+            if state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                state = self.HALF_OPEN  # next call will be the trial
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "times_opened": self._times_opened,
+                "retry_after": self._retry_after() if state == self.OPEN else 0,
+            }
+
+
+class ConcurrencyLimiter:
+    """Caps calls in flight; extra callers wait up to `wait` seconds for a free slot
+    and are refused only if none frees up in that time"""
+
+    def __init__(self, limit, retry_after=2, wait=2.0):
+        self.limit = limit
+        self.retry_after = retry_after
+        self.wait = wait
+        self.in_flight = 0
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+
+    def acquire(self, wait=None):
+        """Take a slot, waiting up to `wait` seconds (default: self.wait)"""
+        if not self._slots.acquire(timeout=self.wait if wait is None else wait):
+            with self._lock:
+                self.rejected += 1
+            raise GatewayUnavailable("Too many payment requests in progress", self.retry_after)
+        with self._lock:
+            self.in_flight += 1
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def snapshot(self):
+        with self._lock:
+            return {"limit": self.limit, "wait": self.wait, "in_flight": self.in_flight, "rejected": self.rejected}
+
+
+class GatewayMetrics:
+    """Per-operation call counts, errors and latency (recent window for percentiles,
+    cumulative LATENCY_BUCKETS counts for the /metrics histogram)"""
+
+    def __init__(self, window=512):
+        self.window = window
+        self._ops = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation, seconds, status=None, error=False):
+        with self._lock:
+            op = self._ops.get(operation)
+            if op is None:
+                op = self._ops[operation] = {
+                    "calls": 0, "errors": 0, "retries": 0, "total_seconds": 0.0,
+                    "max_seconds": 0.0, "statuses": {}, "recent": deque(maxlen=self.window),
+                    "buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+                }
+            op["calls"] += 1
+            op["total_seconds"] += seconds
+            op["max_seconds"] = max(op["max_seconds"], seconds)
+            op["recent"].append(seconds)
+            op["buckets"][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            if error:
+                op["errors"] += 1
+            if status is not None:
+                op["statuses"][status] = op["statuses"].get(status, 0) + 1
+
+    def record_retry(self, operation):
+        with self._lock:
+            if operation in self._ops:
+                self._ops[operation]["retries"] += 1
+
+    def histograms(self):
+        """{operation: (per-bucket counts, total seconds, errors, retries)}"""
+        with self._lock:
+            return {name: (list(op["buckets"]), op["total_seconds"], op["errors"], op["retries"])
+                    for name, op in self._ops.items()}
+
+    def snapshot(self):
+        """Plain-dict view, latencies in milliseconds"""
+        with self._lock:
+            ops = {name: dict(op, recent=sorted(op["recent"]), statuses=dict(op["statuses"]))
+                   for name, op in self._ops.items()}
+        result = {}
+        for name, op in ops.items():
+            recent = op["recent"]
+            result[name] = {
+                "calls": op["calls"],
+                "errors": op["errors"],
+                "retries": op["retries"],
+                "statuses": op["statuses"],
+                "avg_ms": round(op["total_seconds"] / op["calls"] * 1000, 1) if op["calls"] else 0.0,
+                "p50_ms": _percentile_ms(recent, 0.50),
+                "p95_ms": _percentile_ms(recent, 0.95),
+                "max_ms": round(op["max_seconds"] * 1000, 1),
+            }
+        return result
+
+
+def _percentile_ms(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return round(sorted_values[index] * 1000, 1)
+
+
+class CashfreeClient:
+    """Cashfree PG client over one pooled keep-alive session.
+
+    Every call has a connect and a read timeout, so a slow gateway can no
+    longer hold a worker thread indefinitely. Idempotent GETs are retried with
+    jittered exponential backoff; order creation is retried only when the
+    connection itself could not be opened, since a timed-out POST may already
+    have created the order.
+
+    Calls pass through a circuit breaker (transport errors and 5xx count as
+    failures) and a cap on calls in flight, where a caller waits briefly for a
+    free slot; both refuse with GatewayUnavailable so callers can shed load
+    instead of queueing indefinitely behind a degraded gateway.
+    """
+
+    def __init__(self, app_id, secret_key, base_url="https://api.cashfree.com/pg",
+                 connect_timeout=3.05, read_timeout=15, max_retries=2, backoff=0.25, pool_size=16,
+                 max_in_flight=8, acquire_timeout=2.0, failure_threshold=5, reset_timeout=30.0):
+        self.app_id = app_id
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.metrics = GatewayMetrics()
+        self.breaker = CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+        self.limiter = ConcurrencyLimiter(max_in_flight, wait=acquire_timeout)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "x-client-id": app_id,
+            "x-client-secret": secret_key,
+            "x-api-version": CASHFREE_API_VERSION,
+            "Content-Type": "application/json",
+        })
+
+    @property
+    def orders_url(self):
+        return f"{self.base_url}/orders"
+
+    def _sleep_before_retry(self, attempt):
+        time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    def status(self):
+        """Breaker and in-flight state for the admin dashboard"""
+        return {"breaker": self.breaker.snapshot(), "concurrency": self.limiter.snapshot()}
+
+    def _request(self, operation, method, path, idempotent, wait=None, **kwargs):
+        self.limiter.acquire(wait)
+        try:
+            self.breaker.before_call()
+            response = self._send(operation, method, path, idempotent, **kwargs)
+        except GatewayUnavailable:
+            raise  # refused by the breaker, not a gateway failure
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        finally:
+            self.limiter.release()
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def _send(self, operation, method, path, idempotent, **kwargs):
+        attempts = self.max_retries + 1
+        for attempt in range(attempts):
+            last_attempt = attempt + 1 >= attempts
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
+            except requests.exceptions.ConnectTimeout as e:
+                # Nothing was sent, so even a POST is safe to repeat
+                self.metrics.record(operation, time.perf_counter() - start, error=True)
+                if not last_attempt:
+                    self.metrics.record_retry(operation)
+                    self._sleep_before_retry(attempt)
+                    continue
+                raise GatewayError(f"Cashfree {operation} timed out connecting: {e}") from e
+            except requests.exceptions.RequestException as e:
+                self.metrics.record(operation, time.perf_counter() - start, error=True)
+                if idempotent and not last_attempt:
+                    self.metrics.record_retry(operation)
+                    self._sleep_before_retry(attempt)
+                    continue
+                raise GatewayError(f"Cashfree {operation} failed: {e}") from e
+
+            self.metrics.record(operation, time.perf_counter() - start, status=response.status_code,
+                                error=response.status_code >= 500)
+            if idempotent and response.status_code in RETRY_STATUSES and not last_attempt:
+                self.metrics.record_retry(operation)
+                self._sleep_before_retry(attempt)
+                continue
+            return response
+
+    def create_order(self, payload):
+        return self._request("create_order", "POST", "/orders", idempotent=False, json=payload)
+
+    def get_order(self, order_id, wait=None):
+        """`wait` overrides how long to queue for a free in-flight slot"""
+        return self._request("get_order", "GET", f"/orders/{quote(str(order_id), safe='')}", idempotent=True,
+                             wait=wait)
+
+    def get_merchant(self, merchant_id):
+        return self._request("get_merchant", "GET", f"/merchants/{quote(str(merchant_id), safe='')}", idempotent=True)
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Synthetic production-shaped data generator
+Fills users.db (or --db) with realistic distributions: IGNOU-style course codes per
+program, Zipfian course popularity in checkouts, session churn with expired and live
+tokens, study centres across states and pincodes, and placeholder course PDFs under
+uploads/english and uploads/hindi.
+
+Usage: python generate_data.py [--preset small|medium|large] [--users N] [--sessions N]
+                               [--orders N] [--courses N] [--centers N] [--db users.db]
+                               [--uploads uploads] [--no-files] [--pdf-kb 0]
+                               [--live-sessions 0.1] [--zipf 1.1] [--seed 42]
+
+Rows are appended to whatever is already in the database. Every generated user has the
+password "password123". Each order is a payment_orders row plus its user_assignments row,
+as the checkout writes them. --preset large writes about 40M rows; rows go in with
+executemany, one large transaction per table, with secondary indexes dropped during the
+load and rebuilt (plus ANALYZE) at the end. The load runs with synchronous=OFF, so keep
+a copy of a database you care about. Existing upload files are never overwritten.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime
+from itertools import accumulate
+
+PRESETS = {
+    "small": {"users": 10000, "sessions": 30000, "orders": 40000, "courses": 600, "centers": 300},
+    "medium": {"users": 200000, "sessions": 600000, "orders": 1000000, "courses": 2000, "centers": 1000},
+    "large": {"users": 2000000, "sessions": 8000000, "orders": 10000000, "courses": 5000, "centers": 2000},
+}
+
+# program -> (name, years, yearly?, Hindi-medium share, course code prefixes, subjects),
+# most popular first: students per program fall off along this order
+PROGRAMS = {
+    "BA": ("Bachelor of Arts", 3, True, 0.9, ["BEGC", "BHIC", "BPSC", "BSOC", "BECC", "BHDC"],
+           ["English Literature", "History of India", "Political Theory", "Sociology", "Economics", "Hindi Sahitya"]),
+    "BCOM": ("Bachelor of Commerce", 3, True, 0.8, ["BCOC", "BCOG", "BCOS"],
+             ["Financial Accounting", "Business Law", "Corporate Accounting", "Cost Accounting", "Auditing"]),
+    "MBA": ("Master of Business Administration", 2, False, 0.2, ["MMPC", "MMPM", "MMPF", "MMPH"],
+            ["Management Functions", "Marketing", "Financial Management", "Human Resource Management"]),
+    "BCA": ("Bachelor of Computer Applications", 3, False, 0.0, ["BCS", "BCSL"],
+            ["Programming in C", "Data Structures", "Operating Systems", "Computer Networks"]),
+    "MCA": ("Master of Computer Applications", 2, False, 0.0, ["MCS", "MCSL"],
+            ["Algorithms", "Database Management Systems", "Software Engineering", "Web Technologies"]),
+    "MA": ("Master of Arts", 2, True, 0.7, ["MEG", "MHI", "MPS", "MSO"],
+           ["British Poetry", "Modern India", "Comparative Politics", "Social Theory"]),
+    "BBA": ("Bachelor of Business Administration", 3, False, 0.5, ["BBAR", "BBARL"],
+            ["Business Organisation", "Business Communication", "Entrepreneurship", "Retail Operations"]),
+    "MSC": ("Master of Science", 2, False, 0.0, ["MCH", "MPH", "MMT"],
+            ["Organic Chemistry", "Quantum Mechanics", "Real Analysis", "Statistical Methods"]),
+}
+YEARS = ["1st Year", "2nd Year", "3rd Year"]
+QUALIFIERS = ["Introduction to", "Foundations of", "Studies in", "Applied", "Advanced", "Topics in"]
+
+# state -> (regional centre number, pincode prefixes, cities, weight)
+STATES = {
+    "Uttar Pradesh": (27, (20, 28), ["Lucknow", "Kanpur", "Varanasi", "Agra", "Prayagraj"], 16),
+    "Bihar": (5, (80, 85), ["Patna", "Gaya", "Muzaffarpur", "Bhagalpur"], 9),
+    "Maharashtra": (49, (40, 44), ["Mumbai", "Pune", "Nagpur", "Nashik"], 9),
+    "West Bengal": (28, (70, 74), ["Kolkata", "Siliguri", "Durgapur", "Asansol"], 7),
+    "Madhya Pradesh": (15, (45, 48), ["Bhopal", "Indore", "Jabalpur", "Gwalior"], 6),
+    "Rajasthan": (23, (30, 34), ["Jaipur", "Jodhpur", "Udaipur", "Kota"], 6),
+    "Tamil Nadu": (25, (60, 64), ["Chennai", "Madurai", "Coimbatore"], 6),
+    "Karnataka": (13, (56, 59), ["Bengaluru", "Mysuru", "Hubballi"], 5),
+    "Gujarat": (9, (36, 39), ["Ahmedabad", "Surat", "Vadodara", "Rajkot"], 5),
+    "Delhi": (7, (11, 11), ["New Delhi", "Delhi"], 4),
+    "Kerala": (14, (67, 69), ["Thiruvananthapuram", "Kochi", "Kozhikode"], 3),
+    "Odisha": (21, (75, 77), ["Bhubaneswar", "Cuttack", "Sambalpur"], 3),
+    "Haryana": (10, (12, 13), ["Gurugram", "Faridabad", "Karnal"], 2),
+    "Punjab": (22, (14, 16), ["Ludhiana", "Amritsar", "Jalandhar"], 2),
+    "Assam": (4, (78, 78), ["Guwahati", "Jorhat", "Dibrugarh"], 2),
+}
+
+FIRST_NAMES = ["Aarav", "Priya", "Rahul", "Anjali", "Vikram", "Sneha", "Amit", "Pooja", "Rohit", "Neha",
+               "Suresh", "Kavita", "Arjun", "Divya", "Manoj", "Ritu", "Sanjay", "Meena", "Karan", "Swati",
+               "Deepak", "Asha", "Nikhil", "Sunita", "Ravi", "Lakshmi", "Imran", "Fatima", "Harpreet", "Joseph"]
+LAST_NAMES = ["Sharma", "Verma", "Singh", "Kumar", "Gupta", "Yadav", "Patel", "Reddy", "Nair", "Das",
+              "Mishra", "Chauhan", "Joshi", "Iyer", "Banerjee", "Khan", "Ghosh", "Pandey", "Mehta", "Rao",
+              "Thakur", "Jain", "Pillai", "Sinha", "Tiwari", "Kaur", "Ansari", "Bose", "Naidu", "Dubey"]
+# Repeated entries weight the mix; indexed by user id so names are reproducible per user
+EMAIL_DOMAINS = ["gmail.com"] * 6 + ["yahoo.co.in", "outlook.com", "rediffmail.com", "hotmail.com"]
+COURSES_PER_ORDER = [1, 2, 3, 4, 5, 6]
+COURSES_PER_ORDER_WEIGHTS = [35, 25, 18, 10, 7, 5]
+EXAM_TYPES = ["June TEE", "December TEE"]
+
+PASSWORD = "password123"
+BATCH = 50000
+HISTORY_DAYS = 730
+
+
+def _utc(epoch):
+    # SQLite CURRENT_TIMESTAMP format, as the app writes created_at
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(epoch))
+
+
+def _batched(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def zipf_weights(count, exponent):
+    """Cumulative Zipf weights for ranks 1..count, ready for random.choices(cum_weights=...)"""
+    return list(accumulate(1.0 / rank ** exponent for rank in range(1, count + 1)))
+
+
+def student_name(user_id):
+    return f"{FIRST_NAMES[user_id * 7 % len(FIRST_NAMES)]} {LAST_NAMES[user_id * 13 // 3 % len(LAST_NAMES)]}"
+
+
+def student_email(user_id):
+    first, last = student_name(user_id).lower().split()
+    return f"{first}.{last}{user_id}@{EMAIL_DOMAINS[user_id * 31 % len(EMAIL_DOMAINS)]}"
+
+
+def student_mobile(user_id):
+    return f"{'6789'[user_id % 4]}{user_id * 2654435761 % 10 ** 9:09d}"
+
+
+def program_folder(program):
+    # Same folder name resolve_course_pdf derives from courses.program
+    return program.upper().replace('.', '').replace(' ', '')
+
+
+def build_courses(total, rng):
+    """IGNOU-style catalogue: {program: [(code, name, year, semester, has_hindi), ...]} in popularity order"""
+    per_program = max(total // len(PROGRAMS), 1)
+    catalogue = {}
+    for program, (_, years, yearly, hindi_share, prefixes, subjects) in PROGRAMS.items():
+        courses = []
+        for position in range(per_program):
+            prefix = prefixes[position % len(prefixes)]
+            number = position // len(prefixes) + 1
+            # Earlier years come first: first-year courses are taken by the most students
+            year = YEARS[min(position * years // per_program, years - 1)]
+            semester = "Yearly" if yearly else ("1st Semester", "2nd Semester")[position * years * 2 // per_program % 2]
+            name = f"{rng.choice(QUALIFIERS)} {subjects[number % len(subjects)]}"
+            if number > len(subjects):
+                name += f" {'I' * min((number - 1) // len(subjects) + 1, 3)}"
+            courses.append((f"{prefix}-{number:03d}", name, year, semester, rng.random() < hindi_share))
+        catalogue[program] = courses
+    return catalogue
+
+
+def placeholder_pdf(title, pad_kb=0):
+    """Minimal valid one-page PDF showing `title`, optionally padded to roughly `pad_kb` KB"""
+    text = title.replace("\\", "").replace("(", "").replace(")", "")
+    stream = f"BT /F1 24 Tf 72 720 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    # Comment lines are ignored by readers; they stand in for the size of real material
+    for _ in range(pad_kb * 1024 // 64):
+        out += b"%" + b"0" * 62 + b"\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def write_upload_files(uploads_dir, catalogue, pad_kb):
+    """uploads/<medium>/<PROGRAM>/<code>.pdf for every course; existing files are left alone"""
+    written = skipped = 0
+    for program, courses in catalogue.items():
+        for code, name, _, _, has_hindi in courses:
+            for medium in ("english", "hindi") if has_hindi else ("english",):
+                folder = os.path.join(uploads_dir, medium, program_folder(program))
+                os.makedirs(folder, exist_ok=True)
+                path = os.path.join(folder, f"{code}.pdf")
+                if os.path.exists(path):
+                    skipped += 1
+                    continue
+                with open(path, "wb") as f:
+                    f.write(placeholder_pdf(f"{code} {name} ({medium})", pad_kb))
+                written += 1
+    return written, skipped
+
+
+def generate(path, scale, rng, zipf=1.1, live_sessions=0.1):
+    """Bulk-load every table with executemany, one transaction per table"""
+    from database import Database, SCHEMA_INDEXES, ASSIGNMENT_STATUS_BY_ORDER_STATUS
+
+    # Schema first (also adds the default admin, programs and courses)
+    Database(path).pool.close_all()
+
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA cache_size=-262144")
+    # Secondary indexes are rebuilt once at the end instead of per row
+    for sql in SCHEMA_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {sql.split(' ON ')[0].split()[-1]}")
+
+    now = time.time()
+    timings = {}
+
+    def load(table, statements, rows):
+        """statements: one INSERT per table; rows yields one tuple per statement"""
+        start = time.perf_counter()
+        conn.execute("BEGIN")
+        count = 0
+        for batch in _batched(rows):
+            for position, sql in enumerate(statements):
+                conn.executemany(sql, [row[position] for row in batch])
+            count += len(batch) * len(statements)
+        conn.execute("COMMIT")
+        timings[table] = {"rows": count, "seconds": round(time.perf_counter() - start, 2)}
+        print(f"🌱 {table:<28} {count:>11,} rows in {timings[table]['seconds']}s")
+
+    # Programs and courses
+    catalogue = build_courses(scale["courses"], rng)
+    existing_codes = {row[0] for row in conn.execute("SELECT course_code FROM courses")}
+    load("programs", ['''
+        INSERT OR IGNORE INTO programs (program_code, program_name, description) VALUES (?, ?, ?)
+    '''], (((program_folder(program), name, f"{name} ({program})"),)
+           for program, (name, *_) in PROGRAMS.items()))
+    load("courses", ['''
+        INSERT INTO courses (course_code, course_name, program, year, semester, pdf_filename,
+                             pdf_filename_en, pdf_filename_hi, credits, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''], (((code, name, program, year, semester, f"{code}.pdf", f"{code}.pdf",
+             f"{code}.pdf" if has_hindi else None, 2 if code.split("-")[0].endswith("L") else 4,
+             _utc(now - HISTORY_DAYS * 86400), _utc(now)),)
+           for program, courses in catalogue.items()
+           for code, name, year, semester, has_hindi in courses if code not in existing_codes))
+
+    # Study centres, spread over states by weight, pincodes within each state's range
+    states = list(STATES)
+    state_weights = list(accumulate(STATES[state][3] for state in states))
+    existing_centers = {row[0] for row in conn.execute("SELECT center_code FROM study_centers")}
+    centers = []
+    per_state = {}
+    for state in rng.choices(states, cum_weights=state_weights, k=scale["centers"]):
+        region, (low, high), cities, _ = STATES[state]
+        per_state[state] = per_state.get(state, 0) + 1
+        code = f"{region:02d}{per_state[state]:03d}"
+        if code in existing_centers:
+            continue
+        city = rng.choice(cities)
+        centers.append((code, f"{city} Study Centre {per_state[state]}", f"{rng.randint(1, 400)}, College Road",
+                        city, state, f"{rng.randint(low, high)}{rng.randrange(10000):04d}",
+                        f"0{rng.randint(120, 999)}{rng.randrange(10 ** 7):07d}", f"sc{code}@ignou.ac.in"))
+    load("study_centers", ['''
+        INSERT INTO study_centers (center_code, name, address, city, state, pincode, phone, email, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''], ((center + (_utc(now), _utc(now)),) for center in centers))
+    centers = centers or [(code, "Study Centre") for code in existing_centers] or [("0701", "Study Centre")]
+
+    # Users: signups grow over time (skewed recent); each studies one program, chosen by Zipf
+    programs = list(PROGRAMS)
+    first_user = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM users").fetchone()[0]
+    user_count = scale["users"]
+    user_programs = bytearray(rng.choices(range(len(programs)), cum_weights=zipf_weights(len(programs), zipf),
+                                          k=user_count))
+    password_hash = hashlib.sha256(PASSWORD.encode()).hexdigest()
+
+    def user_rows():
+        for offset in range(user_count):
+            user_id = first_user + offset
+            joined = now - HISTORY_DAYS * 86400 * (1 - rng.random() ** 0.5)
+            last_login = _utc(joined + (now - joined) * rng.random()) if rng.random() < 0.85 else None
+            yield ((user_id, student_name(user_id), student_email(user_id), student_mobile(user_id), password_hash,
+                    _utc(joined), last_login, 0 if rng.random() < 0.02 else 1),)
+
+    load("users", ['''
+        INSERT INTO users (id, name, email, mobile, password_hash, created_at, last_login, is_active)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    '''], user_rows())
+
+    def some_user():
+        # A minority of students log in and check out far more often than the rest
+        return first_user + int(user_count * rng.random() ** 2)
+
+    # Sessions: 24-hour tokens as login_user issues them (expires_at is local str(datetime));
+    # the live share was created in the last day, the rest are expired churn from earlier logins
+    def session_rows():
+        for _ in range(scale["sessions"]):
+            age = 86400 * rng.random() if rng.random() < live_sessions else 86400 * (1 + 89 * rng.random())
+            created = now - age
+            yield ((some_user(), os.urandom(24).hex(), _utc(created), str(datetime.fromtimestamp(created + 86400))),)
+
+    load("user_sessions", ['''
+        INSERT INTO user_sessions (user_id, session_token, created_at, expires_at) VALUES (?, ?, ?, ?)
+    '''], session_rows())
+
+    # Orders: uniform arrivals over the history window, so IDs and created_at rise together like
+    # the app's snowflake order IDs; courses come from the student's program with Zipfian popularity
+    from ids import EPOCH_MS, ID_DIGITS, NODE_SHIFT, TIMESTAMP_SHIFT
+
+    course_codes = {program: [course[0] for course in courses] for program, courses in catalogue.items()}
+    course_weights = {program: zipf_weights(len(codes), zipf) for program, codes in course_codes.items()}
+    courses_per_order = list(accumulate(COURSES_PER_ORDER_WEIGHTS))
+    order_count = scale["orders"]
+    start = max(now - HISTORY_DAYS * 86400, EPOCH_MS / 1000)
+    slices = max(-(-order_count // BATCH), 1)
+    width = (now - start) / slices
+
+    def arrivals():
+        # Sorted within consecutive slices of the window, so memory stays at one batch
+        for index in range(slices):
+            count = min(BATCH, order_count - index * BATCH)
+            low = start + index * width
+            yield from sorted(low + width * rng.random() for _ in range(count))
+
+    def order_rows():
+        last_ms = sequence = 0
+        for moment in arrivals():
+            ms = int(moment * 1000) - EPOCH_MS
+            sequence = sequence + 1 if ms == last_ms else 0
+            last_ms = ms
+            order_id = f"ORD{(ms << TIMESTAMP_SHIFT) | (1023 << NODE_SHIFT) | sequence:0{ID_DIGITS}d}"
+
+            user_id = some_user()
+            program = programs[user_programs[user_id - first_user]]
+            picks = rng.choices(course_codes[program], cum_weights=course_weights[program],
+                                k=rng.choices(COURSES_PER_ORDER, cum_weights=courses_per_order)[0])
+            courses = list(dict.fromkeys(picks))
+            amount = len(courses)
+            # Recent orders may still be open at the gateway; older ones are settled
+            if now - moment < 3600 and rng.random() < 0.5:
+                status = "ACTIVE"
+            else:
+                status = "PAID" if rng.random() < 0.88 else "EXPIRED"
+            center_code, center_name = rng.choice(centers)[:2]
+            created_at = _utc(moment)
+            request = {
+                "studentName": student_name(user_id),
+                "enrollmentNumber": f"{time.gmtime(moment).tm_year % 100:02d}{user_id:08d}",
+                "emailId": student_email(user_id),
+                "mobileNumber": student_mobile(user_id),
+                "programmeCode": program,
+                "courseCode": courses[0],
+                "studyCenterCode": center_code,
+                "studyCenterName": center_name,
+                "mediumSelection": "Hindi" if rng.random() < PROGRAMS[program][3] / 2 else "English",
+                "examType": rng.choice(EXAM_TYPES),
+                "courses": courses,
+                "amount": amount,
+                "order_id": order_id,
+            }
+            request_json = json.dumps(request)
+            # payment_data is the request plus the gateway's status, spliced rather than encoded twice
+            payment = request_json[:-1] + f', "status": "PAID", "created_at": "{created_at}"}}' if status == "PAID" else None
+            csv = ",".join(courses)
+            yield ((order_id, user_id, status, amount, request_json, payment, created_at, created_at),
+                   (user_id, csv, csv, order_id, amount, ASSIGNMENT_STATUS_BY_ORDER_STATUS.get(status, "pending"),
+                    created_at))
+
+    load("payment_orders + assignments", ['''
+        INSERT INTO payment_orders (order_id, user_id, status, amount, request_data, payment_data, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', '''
+        INSERT INTO user_assignments (user_id, courses, subjects, transaction_id, amount, status, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''], order_rows())
+
+    conn.close()
+
+    # Reopening through Database recreates every index
+    started = time.perf_counter()
+    database = Database(path)
+    with database.pool.connection() as pooled:
+        pooled.execute("ANALYZE")
+    database.pool.close_all()
+    timings["indexes_and_analyze"] = {"seconds": round(time.perf_counter() - started, 2)}
+    print(f"🌱 indexes + ANALYZE in {timings['indexes_and_analyze']['seconds']}s")
+    return catalogue, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill the database with production-shaped synthetic data")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    for table in PRESETS["small"]:
+        parser.add_argument(f"--{table}", type=int, default=None, help=f"override the preset's {table} count")
+    parser.add_argument("--db", default="users.db", help="database file (default: users.db)")
+    parser.add_argument("--uploads", default="uploads", help="uploads folder for placeholder PDFs")
+    parser.add_argument("--no-files", action="store_true", help="do not write placeholder PDFs")
+    parser.add_argument("--pdf-kb", type=int, default=0, help="pad each placeholder PDF to about this size")
+    parser.add_argument("--live-sessions", type=float, default=0.1, help="share of sessions still valid")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent for program and course popularity")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    scale = dict(PRESETS[args.preset])
+    for table in scale:
+        if getattr(args, table) is not None:
+            scale[table] = getattr(args, table)
+
+    # database.py opens DATABASE_PATH on import; point it at the target
+    os.environ["DATABASE_PATH"] = args.db
+    rng = random.Random(args.seed)
+
+    print(f"🗄️  Generating into {args.db}: " + ", ".join(f"{k}={v:,}" for k, v in scale.items()))
+    started = time.perf_counter()
+    catalogue, _ = generate(args.db, scale, rng, zipf=args.zipf, live_sessions=args.live_sessions)
+    if not args.no_files:
+        written, skipped = write_upload_files(args.uploads, catalogue, args.pdf_kb)
+        print(f"📄 {written:,} placeholder PDFs written under {args.uploads}/ ({skipped:,} already there)")
+    print(f"✅ Done in {time.perf_counter() - started:.1f}s; {os.path.getsize(args.db) / 1e6:,.0f} MB on disk")
+
+
+if __name__ == "__main__":
+    main()
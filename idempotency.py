@@ -0,0 +1,74 @@
+import hashlib
+import json
+import threading
+
+from cache import TTLCache
+
+
+class IdempotencyTimeout(Exception):
+    """A duplicate request gave up waiting for the original to finish"""
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class IdempotencyStore:
+    """Runs each idempotency key's operation once and replays the result.
+
+    Completed results are kept in a bounded TTL cache. A duplicate that arrives
+    while the first request is still running waits for it (single-flight)
+    instead of repeating the work. Only results accepted by `should_store` are
+    kept, so a failed attempt can be retried with the same key; waiters of a
+    failed attempt get its result or exception too.
+    """
+
+    def __init__(self, maxsize=10000, ttl=600, wait_timeout=30, should_store=None):
+        self.completed = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.wait_timeout = wait_timeout
+        self.should_store = should_store or (lambda result: True)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def run(self, key, operation):
+        """Return (result, replayed) for `key`, calling `operation()` at most once at a time"""
+        with self._lock:
+            result = self.completed.get(key)
+            if result is not None:
+                return result, True
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _Flight()
+
+        if not leader:
+            if not flight.done.wait(self.wait_timeout):
+                raise IdempotencyTimeout("The original request is still being processed")
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = operation()
+            if self.should_store(flight.result):
+                self.completed.set(key, flight.result)
+            return flight.result, False
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            flight.done.set()
+
+    def forget(self, key):
+        self.completed.pop(key)
+
+
+def derive_key(scope, payload):
+    """Stable key for a JSON-serialisable payload within a scope (e.g. the user id)"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{scope}:{canonical}".encode("utf-8")).hexdigest()
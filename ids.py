@@ -0,0 +1,156 @@
+import os
+import secrets
+import socket
+import threading
+import time
+
+# 2024-01-01T00:00:00Z; 41 bits of milliseconds from here last until 2093
+EPOCH_MS = 1704067200000
+
+NODE_BITS = 10
+SEQUENCE_BITS = 12
+MAX_NODE_ID = (1 << NODE_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+NODE_SHIFT = SEQUENCE_BITS
+TIMESTAMP_SHIFT = NODE_BITS + SEQUENCE_BITS
+
+# Decimal width of a 63-bit ID; zero padding keeps string order equal to numeric order
+ID_DIGITS = 19
+
+
+def default_node_id():
+    """ORDER_NODE_ID if set, else None (lease one with NodeLease instead)"""
+    configured = os.getenv("ORDER_NODE_ID")
+    if configured is not None:
+        return int(configured)
+    return None
+
+
+class NodeLease:
+    """A node id leased from the database for as long as this process keeps renewing it.
+
+    Every process sharing the database gets a different node; a crashed
+    process's node is handed out again once its lease has run out. The
+    generator stops issuing IDs at half the lease after the last successful
+    renewal, well before anyone else may take the node over.
+    The highest node id is left out; generate_data.py writes its history with it.
+    """
+
+    def __init__(self, database, lease_seconds=300, max_node_id=MAX_NODE_ID - 1):
+        self.database = database
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+        started = time.monotonic()
+        result = database.claim_order_node(self.owner, lease_seconds, max_node_id)
+        if not result["success"]:
+            raise RuntimeError(result["error"])
+        self.node_id = result["node_id"]
+        self._valid_until = started + lease_seconds / 2
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="order-node-lease", daemon=True)
+        self._thread.start()
+
+    def valid(self):
+        return time.monotonic() < self._valid_until
+
+    def renew(self):
+        """Extend the lease; returns False if it could not be"""
+        started = time.monotonic()
+        result = self.database.renew_order_node(self.node_id, self.owner)
+        if not result["success"]:
+            print(f"⚠️ Order id node {self.node_id}: {result['error']}")
+            return False
+        if not result["renewed"]:
+            print(f"❌ Order id node {self.node_id} was taken over by another process; no more IDs from here")
+            self._valid_until = 0
+            self._stop.set()
+            return False
+        self._valid_until = started + self.lease_seconds / 2
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.lease_seconds / 10):
+            self.renew()
+
+    def release(self):
+        self._stop.set()
+        self._valid_until = 0
+        self.database.release_order_node(self.node_id, self.owner)
+
+
+class SnowflakeGenerator:
+    """64-bit, time-ordered unique IDs: 41 bits ms | 10 bits node | 12 bits sequence.
+
+    Up to 4096 IDs per millisecond per node. When a millisecond's sequence is
+    used up the generator moves on to the next millisecond instead of sleeping,
+    and it never goes back in time if the wall clock does, so IDs from one
+    generator are strictly increasing. The critical section is a handful of
+    integer operations.
+
+    Node ids must be unique among everything generating IDs at the same time:
+    pass one explicitly (ORDER_NODE_ID) or a NodeLease, which refuses to go on
+    once it can no longer vouch for its node.
+    """
+
+    def __init__(self, node_id=None, epoch_ms=EPOCH_MS, lease=None):
+        if lease is not None:
+            node_id = lease.node_id
+        if node_id is None:
+            raise ValueError("node_id is required; set ORDER_NODE_ID or lease one with NodeLease")
+        if not 0 <= node_id <= MAX_NODE_ID:
+            raise ValueError(f"node_id must be between 0 and {MAX_NODE_ID}")
+        self.node_id = node_id
+        self.lease = lease
+        self.epoch_ms = epoch_ms
+        self._node_bits = node_id << NODE_SHIFT
+        self._last_ms = -1
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def _check_lease(self):
+        if self.lease is not None and not self.lease.valid():
+            raise RuntimeError(f"Lease on order id node {self.node_id} has lapsed")
+
+    def next_id(self):
+        self._check_lease()
+        now = time.time_ns() // 1000000 - self.epoch_ms
+        with self._lock:
+            if now > self._last_ms:
+                self._last_ms = now
+                self._sequence = 0
+            else:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    # Sequence exhausted (or clock stepped back): borrow the next millisecond
+                    self._last_ms += 1
+            return (self._last_ms << TIMESTAMP_SHIFT) | self._node_bits | self._sequence
+
+    def next_ids(self, count):
+        """Reserve `count` consecutive IDs under a single lock acquisition"""
+        if count <= 0:
+            return []
+        self._check_lease()
+        now = time.time_ns() // 1000000 - self.epoch_ms
+        with self._lock:
+            if now > self._last_ms:
+                first = now << SEQUENCE_BITS
+            else:
+                first = (self._last_ms << SEQUENCE_BITS) + self._sequence + 1
+            # (ms, sequence) pairs are consecutive positions on one counter
+            self._last_ms, self._sequence = divmod(first + count - 1, MAX_SEQUENCE + 1)
+        node_bits = self._node_bits
+        return [((p >> SEQUENCE_BITS) << TIMESTAMP_SHIFT) | node_bits | (p & MAX_SEQUENCE)
+                for p in range(first, first + count)]
+
+    def next_order_id(self, prefix="ORD"):
+        """Gateway-safe string ID, e.g. ORD0012345678901234567"""
+        return f"{prefix}{self.next_id():0{ID_DIGITS}d}"
+
+
+def parse_id(snowflake_id, epoch_ms=EPOCH_MS):
+    """Split an ID into (unix_ms, node_id, sequence)"""
+    return (
+        (snowflake_id >> TIMESTAMP_SHIFT) + epoch_ms,
+        (snowflake_id >> NODE_SHIFT) & MAX_NODE_ID,
+        snowflake_id & MAX_SEQUENCE,
+    )
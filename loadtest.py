@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+End-to-end checkout load test
+Each iteration is one new student going through the flow test_payment.py checks by hand:
+register -> login -> /api/courses/filter -> /api/course-material -> /initiate-payment
+-> /payment-success -> /get-pdf. Reports p50/p95/p99 latency and throughput per endpoint,
+saves the results as JSON and flags regressions against a stored baseline.
+
+Usage:
+  # Start a mock gateway and the app (waitress) locally, then run 20 VUs for 60 s
+  python loadtest.py --start-server --vus 20 --duration 60
+
+  # Open model: 10 new checkouts per second, at most 50 in flight, against a running server
+  # (started with CASHFREE_API_BASE pointing at mock_cashfree.py)
+  python loadtest.py --base-url http://127.0.0.1:5000 --mock-url http://127.0.0.1:8900 \\
+                     --arrival-rate 10 --vus 50 --duration 120
+
+  # The started app inherits this environment, e.g. GATEWAY_MAX_IN_FLIGHT=8 python loadtest.py ...
+
+  # Compare with (or record) a baseline; exits with status 1 on regression
+  python loadtest.py --start-server --baseline loadtest_baseline.json [--save-baseline]
+"""
+
+import argparse
+import json
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import requests
+
+from mock_cashfree import MockCashfree
+
+# Steps of one checkout, in order; also the endpoint names in the report
+STEPS = ("register", "login", "courses_filter", "course_material", "initiate_payment",
+         "payment_success", "get_pdf")
+
+COURSES = ["MMPC-001", "MMPC-002"]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class Recorder:
+    """Latency samples and outcomes per endpoint, shared by all virtual users"""
+
+    def __init__(self):
+        self.samples = {step: [] for step in STEPS}
+        self.statuses = {step: {} for step in STEPS}
+        self.failures = {step: 0 for step in STEPS}
+        self.iterations = 0
+        self.failed_iterations = 0
+        self.dropped_iterations = 0
+        self.error_samples = []
+        self._lock = threading.Lock()
+
+    def record(self, step, seconds, status, ok):
+        with self._lock:
+            self.samples[step].append(seconds)
+            statuses = self.statuses[step]
+            statuses[status] = statuses.get(status, 0) + 1
+            if not ok:
+                self.failures[step] += 1
+
+    def finish_iteration(self, error=None):
+        with self._lock:
+            self.iterations += 1
+            if error:
+                self.failed_iterations += 1
+                if len(self.error_samples) < 20:
+                    self.error_samples.append(error)
+
+    def drop_iteration(self):
+        with self._lock:
+            self.dropped_iterations += 1
+
+    def summary(self, elapsed):
+        endpoints = {}
+        for step in STEPS:
+            values = sorted(self.samples[step])
+            count = len(values)
+            endpoints[step] = {
+                "requests": count,
+                "failures": self.failures[step],
+                "error_rate": round(self.failures[step] / count, 4) if count else 0.0,
+                "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+                "mean_ms": round(sum(values) / count * 1000, 2) if count else 0.0,
+                "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+                "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+                "statuses": {str(k): v for k, v in sorted(self.statuses[step].items(), key=str)},
+            }
+        return {
+            "duration_seconds": round(elapsed, 2),
+            "iterations": self.iterations,
+            "failed_iterations": self.failed_iterations,
+            "dropped_iterations": self.dropped_iterations,
+            "checkouts_per_second": round((self.iterations - self.failed_iterations) / elapsed, 2) if elapsed else 0.0,
+            "endpoints": endpoints,
+            "error_samples": self.error_samples,
+        }
+
+
+class CheckoutFlow:
+    """One virtual user's checkout, timing every request"""
+
+    def __init__(self, base_url, mock_url, recorder, run_id, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.mock_url = mock_url.rstrip("/") if mock_url else None
+        self.recorder = recorder
+        self.run_id = run_id
+        self.timeout = timeout
+        self._counter = 0
+        self._counter_lock = threading.Lock()
+
+    def _next_user(self):
+        with self._counter_lock:
+            self._counter += 1
+            n = self._counter
+        return {
+            "name": f"Load User {n}",
+            "email": f"load-{self.run_id}-{n}@example.com",
+            "mobile": f"9{(int(self.run_id, 16) + n) % 10 ** 9:09d}",
+            "password": "loadtest123",
+        }
+
+    def _call(self, session, step, method, path, expect, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = session.request(method, self.base_url + path, timeout=self.timeout,
+                                       allow_redirects=False, **kwargs)
+        except requests.RequestException as e:
+            self.recorder.record(step, time.perf_counter() - start, type(e).__name__, False)
+            raise RuntimeError(f"{step}: {type(e).__name__}: {e}")
+        elapsed = time.perf_counter() - start
+        ok = response.status_code in expect
+        self.recorder.record(step, elapsed, response.status_code, ok)
+        if not ok:
+            raise RuntimeError(f"{step}: HTTP {response.status_code}: {response.text[:200]}")
+        return response
+
+    def run(self):
+        user = self._next_user()
+        with requests.Session() as session:
+            try:
+                self._call(session, "register", "POST", "/api/register", (201,), json=user)
+                self._call(session, "login", "POST", "/api/login", (200,),
+                           json={"email": user["email"], "password": user["password"]})
+                self._call(session, "courses_filter", "GET", "/api/courses/filter", (200,),
+                           params={"program": "MBA", "year": "1st Year"})
+                self._call(session, "course_material", "GET", "/api/course-material", (200,),
+                           params={"codes": ",".join(COURSES), "medium": "english"})
+                order = self._call(session, "initiate_payment", "POST", "/initiate-payment", (200,), json={
+                    "courses": COURSES,
+                    "studentName": user["name"],
+                    "enrollmentNumber": "123456789",
+                    "mobileNumber": user["mobile"],
+                    "emailId": user["email"],
+                    "programSelection": "MBA",
+                    "mediumSelection": "english",
+                }).json()
+                order_id = order["transactionId"]
+                if self.mock_url:
+                    # The student pays on the gateway's page (not timed)
+                    requests.post(f"{self.mock_url}/__mock/orders/{order_id}",
+                                  json={"order_status": "PAID"}, timeout=self.timeout)
+                self._call(session, "payment_success", "GET", "/payment-success", (302,),
+                           params={"order_id": order_id})
+                self._call(session, "get_pdf", "GET", f"/get-pdf/{COURSES[0]}", (200,))
+            except RuntimeError as e:
+                self.recorder.finish_iteration(str(e))
+                return
+        self.recorder.finish_iteration()
+
+
+def run_load(flow, vus, duration, iterations=None, arrival_rate=0.0, ramp_up=0.0):
+    """Drive `flow` with `vus` virtual users and return the elapsed seconds.
+
+    With arrival_rate == 0 every VU loops back-to-back (closed model). Otherwise
+    iterations start at `arrival_rate` per second regardless of how fast the
+    server answers (open model); an arrival with no idle VU is dropped and counted.
+    """
+    deadline = time.monotonic() + duration
+    started = threading.Semaphore(iterations) if iterations else None
+    stop = threading.Event()
+    arrivals = queue.Queue() if arrival_rate > 0 else None
+    idle = threading.Semaphore(vus)
+
+    def take_iteration():
+        if stop.is_set() or time.monotonic() >= deadline:
+            return False
+        return started.acquire(blocking=False) if started else True
+
+    def closed_worker(index):
+        if ramp_up:
+            time.sleep(ramp_up * index / vus)
+        while take_iteration():
+            flow.run()
+
+    def open_worker():
+        while True:
+            item = arrivals.get()
+            if item is None:
+                return
+            try:
+                flow.run()
+            finally:
+                idle.release()
+
+    begin = time.perf_counter()
+    if arrivals is None:
+        workers = [threading.Thread(target=closed_worker, args=(i,), daemon=True) for i in range(vus)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    else:
+        workers = [threading.Thread(target=open_worker, daemon=True) for _ in range(vus)]
+        for worker in workers:
+            worker.start()
+        interval = 1.0 / arrival_rate
+        next_arrival = time.monotonic()
+        while take_iteration():
+            if idle.acquire(blocking=False):
+                arrivals.put(next_arrival)
+            else:
+                flow.recorder.drop_iteration()
+            next_arrival += interval
+            time.sleep(max(0.0, next_arrival - time.monotonic()))
+        for _ in workers:
+            arrivals.put(None)
+        for worker in workers:
+            worker.join()
+    return time.perf_counter() - begin
+
+
+def compare_with_baseline(results, baseline, tolerance, min_delta_ms):
+    """Return a list of human-readable regressions (empty if none)"""
+    regressions = []
+    for step, current in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(step)
+        if not previous or not current["requests"]:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            old, new = previous[metric], current[metric]
+            if new > old * (1 + tolerance) and new - old >= min_delta_ms:
+                regressions.append(f"{step} {metric}: {old} -> {new} ms")
+        if current["error_rate"] > previous["error_rate"] + 0.01:
+            regressions.append(f"{step} error_rate: {previous['error_rate']} -> {current['error_rate']}")
+    old_rate, new_rate = baseline.get("checkouts_per_second", 0), results["checkouts_per_second"]
+    if old_rate and new_rate < old_rate * (1 - tolerance):
+        regressions.append(f"checkouts_per_second: {old_rate} -> {new_rate}")
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL,
+                                       text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def start_local_stack(port, threads, gateway_latency):
+    """Start a mock gateway in-process and the app under waitress in a subprocess"""
+    mock = MockCashfree(latency=gateway_latency, paid_ratio=1.0, pay_after=3600).start()
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    env = dict(os.environ,
+               DATABASE_PATH=os.path.join(workdir, "loadtest.db"),
+               CASHFREE_API_BASE=mock.base_url,
+               CASHFREE_APP_ID="loadtest", CASHFREE_SECRET_KEY="loadtest")
+    # Server output goes to a file: an unread pipe fills up and blocks the app mid-run
+    log_path = os.path.join(workdir, "server.log")
+    with open(log_path, "w") as log:
+        server = subprocess.Popen(
+            [sys.executable, "-m", "waitress", f"--port={port}", f"--threads={threads}", "app:app"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        if server.poll() is not None:
+            with open(log_path) as log:
+                raise RuntimeError(f"App failed to start: {log.read()[-2000:]}")
+        try:
+            if requests.get(f"{base_url}/test", timeout=1).status_code == 200:
+                break
+        except requests.RequestException:
+            time.sleep(0.2)
+    else:
+        server.terminate()
+        raise RuntimeError("App did not become ready")
+
+    def stop():
+        server.terminate()
+        server.wait(10)
+        mock.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return base_url, mock.base_url.rsplit("/pg", 1)[0], stop
+
+
+def print_results(results):
+    print(f"⏱️  {results['iterations']} checkouts in {results['duration_seconds']}s "
+          f"({results['checkouts_per_second']}/s completed, {results['failed_iterations']} failed, "
+          f"{results['dropped_iterations']} dropped)")
+    print(f"{'endpoint':<18}{'reqs':>7}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for step, stats in results["endpoints"].items():
+        print(f"{step:<18}{stats['requests']:>7}{stats['throughput_rps']:>9}{stats['p50_ms']:>10}"
+              f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['failures']:>8}")
+    for error in results["error_samples"][:5]:
+        print(f"❌ {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end checkout load test")
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000", help="running app to test")
+    parser.add_argument("--mock-url", default=None,
+                        help="mock_cashfree.py root URL, used to mark orders PAID (e.g. http://127.0.0.1:8900)")
+    parser.add_argument("--start-server", action="store_true",
+                        help="start a mock gateway and the app (waitress, fresh database) for this run")
+    parser.add_argument("--port", type=int, default=5055, help="app port with --start-server")
+    parser.add_argument("--threads", type=int, default=4, help="waitress threads with --start-server")
+    parser.add_argument("--gateway-latency", default="lognormal:80,0.5",
+                        help="mock gateway latency spec with --start-server")
+    parser.add_argument("--vus", type=int, default=10, help="virtual users (max concurrent checkouts)")
+    parser.add_argument("--arrival-rate", type=float, default=0.0,
+                        help="new checkouts per second (0 = each VU loops back-to-back)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to generate load")
+    parser.add_argument("--iterations", type=int, default=None, help="stop after this many checkouts")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="seconds to start all VUs (closed model)")
+    parser.add_argument("--out", default="loadtest_results.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", default=None, help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="write these results to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.20, help="allowed relative slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="ignore latency changes smaller than this")
+    args = parser.parse_args()
+
+    stop_stack = None
+    base_url, mock_url = args.base_url, args.mock_url
+    if args.start_server:
+        base_url, mock_url, stop_stack = start_local_stack(args.port, args.threads, args.gateway_latency)
+        print(f"🚀 App on {base_url}, mock gateway on {mock_url}")
+
+    recorder = Recorder()
+    flow = CheckoutFlow(base_url, mock_url, recorder, run_id=uuid.uuid4().hex[:8])
+    try:
+        elapsed = run_load(flow, args.vus, args.duration, args.iterations, args.arrival_rate, args.ramp_up)
+    finally:
+        if stop_stack:
+            stop_stack()
+
+    results = recorder.summary(elapsed)
+    results["config"] = {
+        "base_url": base_url, "vus": args.vus, "arrival_rate": args.arrival_rate, "duration": args.duration,
+        "iterations": args.iterations, "started_server": args.start_server,
+        "threads": args.threads if args.start_server else None,
+        "gateway_latency": args.gateway_latency if args.start_server else None,
+    }
+    results["git_revision"] = git_revision()
+    results["finished_at"] = datetime.now(timezone.utc).isoformat()
+
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print_results(results)
+    print(f"📄 Results written to {args.out}")
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"📌 Baseline saved to {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"🔴 {len(regressions)} regression(s) against {args.baseline} "
+                  f"(baseline {baseline.get('git_revision')}):")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"🟢 No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
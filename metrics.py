@@ -0,0 +1,152 @@
+import bisect
+import threading
+
+# Seconds; request and gateway latencies
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Seconds of SQL per request
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def histogram_samples(name, labels, buckets, counts, total):
+    """Prometheus samples for one histogram: `counts` holds per-bucket (not cumulative)
+    counts with the +Inf bucket last, `total` the sum of observed values"""
+    samples = []
+    cumulative = 0
+    for bound, count in zip(buckets + (float("inf"),), counts):
+        cumulative += count
+        samples.append((f"{name}_bucket", labels + (("le", _format_value(float(bound))),), cumulative))
+    samples.append((f"{name}_sum", labels, total))
+    samples.append((f"{name}_count", labels, cumulative))
+    return samples
+
+
+class _Shard:
+    __slots__ = ("counters", "histograms")
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+
+
+class Metrics:
+    """Counters, gauges and histograms in the Prometheus text format.
+
+    Every thread records into its own shard, so the hot path is a couple of
+    dict operations with no lock; a scrape adds the shards up. Gauges that
+    go up and down on the same thread (requests in flight) use inc/dec the
+    same way. Values owned by other components (cache hit counts, waitress
+    queue depth) are read at scrape time by registered collectors.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._types = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def describe(self, name, kind, help_text, buckets=None):
+        """Declare a metric's type ('counter', 'gauge' or 'histogram') and help text"""
+        self._types[name] = (kind, help_text, buckets)
+
+    def collector(self, func):
+        """Register func() -> iterable of (sample name, labels, value), called on every scrape"""
+        self._collectors.append(func)
+        return func
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def inc(self, name, labels=(), value=1):
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def dec(self, name, labels=(), value=1):
+        self.inc(name, labels, -value)
+
+    def observe(self, name, value, labels=()):
+        histograms = self._shard().histograms
+        key = (name, labels)
+        entry = histograms.get(key)
+        if entry is None:
+            buckets = self._types[name][2]
+            entry = histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+        entry[bisect.bisect_left(self._types[name][2], value)] += 1
+        entry[-1] += value
+
+    def values(self):
+        """Counters and histograms summed over every thread's shard"""
+        with self._lock:
+            shards = list(self._shards)
+        counters = {}
+        histograms = {}
+        for shard in shards:
+            # list() copies under the GIL, so a recording thread cannot change the dict mid-iteration
+            for key, value in list(shard.counters.items()):
+                counters[key] = counters.get(key, 0) + value
+            for key, entry in list(shard.histograms.items()):
+                merged = histograms.get(key)
+                if merged is None:
+                    histograms[key] = list(entry)
+                else:
+                    for i, value in enumerate(entry):
+                        merged[i] += value
+        return counters, histograms
+
+    def render(self):
+        """Everything recorded and collected, in the Prometheus text exposition format"""
+        counters, histograms = self.values()
+        families = {}
+        for (name, labels), value in counters.items():
+            families.setdefault(name, []).append((name, labels, value))
+        for (name, labels), entry in histograms.items():
+            samples = histogram_samples(name, labels, self._types[name][2], entry[:-1], entry[-1])
+            families.setdefault(name, []).extend(samples)
+        for func in self._collectors:
+            for sample_name, labels, value in func():
+                family = sample_name
+                for suffix in ("_bucket", "_sum", "_count"):
+                    if sample_name.endswith(suffix) and sample_name[:-len(suffix)] in self._types:
+                        family = sample_name[:-len(suffix)]
+                families.setdefault(family, []).append((sample_name, labels, value))
+
+        lines = []
+        for family in sorted(families):
+            kind, help_text, _ = self._types.get(family, ("untyped", "", None))
+            if help_text:
+                lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} {kind}")
+            for sample_name, labels, value in families[family]:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def waitress_dispatcher(environ):
+    """The waitress task dispatcher serving this request, or None outside waitress"""
+    check = environ.get("waitress.client_disconnected")
+    channel = getattr(check, "__self__", None)
+    return getattr(getattr(channel, "server", None), "task_dispatcher", None)
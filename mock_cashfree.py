@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Cashfree PG API, for tests and load tests without a network
+Implements the endpoints the app calls (create order, fetch order, fetch merchant)
+with configurable latency, error rates and order status transitions.
+
+Usage: python mock_cashfree.py [--port 8900] [--latency lognormal:80,0.5] [--error-rate 0.01]
+                               [--paid-ratio 0.9] [--pay-after 2] [--expire-after 900]
+                               [--webhook-url http://localhost:5000/payment-callback]
+Then start the app with CASHFREE_API_BASE=http://127.0.0.1:8900/pg
+
+Latency specs: fixed:MS | uniform:MIN,MAX | normal:MEAN,STDEV | lognormal:MEDIAN,SIGMA
+Control endpoints: GET /__mock/stats, POST /__mock/orders/<order_id> {"order_status": "PAID"}
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from webhooks import SIGNATURE_HEADER, TIMESTAMP_HEADER, sign_payload
+
+ORDER_STATUSES = ("ACTIVE", "PAID", "EXPIRED", "TERMINATED")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Deep accept backlog so bursts from load tests queue instead of being refused
+    request_queue_size = 1024
+
+
+def parse_latency(spec):
+    """Return a function giving one latency sample in seconds for a spec like 'lognormal:80,0.5'"""
+    if not spec:
+        return lambda: 0.0
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed" and len(values) == 1:
+        return lambda: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda: random.uniform(values[0], values[1]) / 1000
+    if kind == "normal" and len(values) == 2:
+        return lambda: max(0.0, random.gauss(values[0], values[1])) / 1000
+    if kind == "lognormal" and len(values) == 2:
+        mu = math.log(values[0])
+        return lambda: random.lognormvariate(mu, values[1]) / 1000
+    raise ValueError(f"Invalid latency spec: {spec!r}")
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, timezone(timedelta(hours=5, minutes=30))).isoformat(timespec="seconds")
+
+
+class MockOrder:
+    """One order and the status it will move to, decided when it is created"""
+
+    def __init__(self, payload, outcome, settle_at, expire_at):
+        self.payload = payload
+        self.created = time.time()
+        self.status = "ACTIVE"
+        self.outcome = outcome
+        self.settle_at = settle_at
+        self.expire_at = expire_at
+        self.cf_order_id = random.randint(10 ** 9, 10 ** 10 - 1)
+        self.payment_session_id = f"session_{uuid.uuid4().hex}"
+
+    def advance(self, now):
+        """Apply any transition that is due; returns the new status if it changed"""
+        if self.status != "ACTIVE":
+            return None
+        if self.outcome == "PAID" and now >= self.settle_at:
+            self.status = "PAID"
+        elif now >= self.expire_at:
+            self.status = "EXPIRED"
+        else:
+            return None
+        return self.status
+
+    def to_dict(self):
+        payload = self.payload
+        return {
+            "cf_order_id": str(self.cf_order_id),
+            "entity": "order",
+            "order_id": payload["order_id"],
+            "order_amount": payload["order_amount"],
+            "order_currency": payload.get("order_currency", "INR"),
+            "order_status": self.status,
+            "payment_session_id": self.payment_session_id,
+            "order_expiry_time": _iso(self.expire_at),
+            "created_at": _iso(self.created),
+            "customer_details": payload.get("customer_details", {}),
+            "order_meta": payload.get("order_meta", {}),
+            "order_note": payload.get("order_note"),
+            "order_tags": payload.get("order_tags"),
+        }
+
+
+class MockCashfree:
+    """In-memory Cashfree PG API served on a background thread.
+
+    Each created order is ACTIVE; with probability `paid_ratio` it becomes PAID
+    `pay_after` seconds later, otherwise it turns EXPIRED after `expire_after`.
+    `error_rate` of requests get one of `error_statuses` and `drop_rate` have
+    their connection closed without a reply. When `webhook_url` is set, a
+    Cashfree-style PAYMENT_SUCCESS_WEBHOOK, signed with `webhook_secret` (the
+    app's CASHFREE_SECRET_KEY), is posted there on each payment.
+    Orders the mock has never seen return 404 unless `unknown_orders` is
+    "create", in which case they are adopted on first fetch (for reconciling
+    an existing database).
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=None, create_latency=None, fetch_latency=None,
+                 error_rate=0.0, error_statuses=(500, 502, 503), drop_rate=0.0, paid_ratio=1.0,
+                 pay_after=0.0, expire_after=900.0, webhook_url=None, unknown_orders="404",
+                 webhook_secret="secret", check_credentials=True, seed=None):
+        if seed is not None:
+            random.seed(seed)
+        default_latency = parse_latency(latency)
+        self.latency = {
+            "create_order": parse_latency(create_latency) if create_latency else default_latency,
+            "get_order": parse_latency(fetch_latency) if fetch_latency else default_latency,
+            "get_merchant": default_latency,
+        }
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.drop_rate = drop_rate
+        self.paid_ratio = paid_ratio
+        self.pay_after = pay_after
+        self.expire_after = expire_after
+        self.webhook_url = webhook_url
+        self.webhook_secret = webhook_secret
+        self.unknown_orders = unknown_orders
+        self.check_credentials = check_credentials
+        self.orders = {}
+        self.stats = {"requests": 0, "errors": 0, "dropped": 0, "created": 0, "fetched": 0,
+                      "webhooks_sent": 0, "webhooks_failed": 0}
+        self._lock = threading.Lock()
+        self._webhooks = []
+        self._webhook_ready = threading.Condition(self._lock)
+        self._stopping = False
+
+        self.server = _Server((host, port), self._handler_class())
+        self._threads = []
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/pg"
+
+    def start(self):
+        for target in (self.server.serve_forever, self._send_webhooks):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        with self._lock:
+            self._stopping = True
+            self._webhook_ready.notify_all()
+        self.server.shutdown()
+        self.server.server_close()
+
+    # Order state
+    def _new_order(self, payload):
+        now = time.time()
+        outcome = "PAID" if random.random() < self.paid_ratio else "EXPIRED"
+        return MockOrder(payload, outcome, now + self.pay_after, now + self.expire_after)
+
+    def create_order(self, payload):
+        """Return (status_code, body) for POST /orders"""
+        order_id = payload.get("order_id")
+        customer = payload.get("customer_details") or {}
+        try:
+            amount_ok = float(payload.get("order_amount", 0)) >= 1
+        except (TypeError, ValueError):
+            amount_ok = False
+        if not order_id or not amount_ok or not customer.get("customer_id") or not customer.get("customer_phone"):
+            return 400, _error("order_id, order_amount >= 1 and customer_details are required",
+                               "request_invalid", "invalid_request_error")
+        with self._lock:
+            if order_id in self.orders:
+                return 409, _error("order with same id is already present", "order_already_exists",
+                                   "invalid_request_error")
+            order = self.orders[order_id] = self._new_order(payload)
+            self.stats["created"] += 1
+            if order.outcome == "PAID" and self.webhook_url:
+                heapq.heappush(self._webhooks, (order.settle_at, order_id))
+                self._webhook_ready.notify()
+            return 200, order.to_dict()
+
+    def get_order(self, order_id):
+        """Return (status_code, body) for GET /orders/<order_id>"""
+        with self._lock:
+            order = self.orders.get(order_id)
+            if order is None and self.unknown_orders == "create":
+                order = self.orders[order_id] = self._new_order(
+                    {"order_id": order_id, "order_amount": 1, "customer_details": {}})
+            if order is None:
+                return 404, _error("order not found", "order_not_found", "invalid_request_error")
+            order.advance(time.time())
+            self.stats["fetched"] += 1
+            return 200, order.to_dict()
+
+    def set_status(self, order_id, status):
+        """Force an order into `status` (control endpoint and tests)"""
+        if status not in ORDER_STATUSES:
+            raise ValueError(f"Unknown order status: {status}")
+        with self._lock:
+            order = self.orders.get(order_id)
+            if order is None:
+                order = self.orders[order_id] = self._new_order(
+                    {"order_id": order_id, "order_amount": 1, "customer_details": {}})
+            # A forced ACTIVE order stays unpaid (it can still expire)
+            order.status = order.outcome = status
+            return order.to_dict()
+
+    def snapshot(self):
+        with self._lock:
+            by_status = {}
+            for order in self.orders.values():
+                order.advance(time.time())
+                by_status[order.status] = by_status.get(order.status, 0) + 1
+            return {**self.stats, "orders": by_status}
+
+    # Webhooks
+    def _send_webhooks(self):
+        session = requests.Session()
+        while True:
+            with self._lock:
+                while not self._stopping and (not self._webhooks or self._webhooks[0][0] > time.time()):
+                    timeout = self._webhooks[0][0] - time.time() if self._webhooks else None
+                    self._webhook_ready.wait(timeout)
+                if self._stopping:
+                    return
+                _, order_id = heapq.heappop(self._webhooks)
+                order = self.orders[order_id]
+                order.advance(time.time())
+                if order.status != "PAID":
+                    continue
+                body = _payment_webhook(order)
+            try:
+                raw_body = json.dumps(body).encode()
+                timestamp = str(int(time.time() * 1000))
+                headers = {
+                    "Content-Type": "application/json",
+                    TIMESTAMP_HEADER: timestamp,
+                    SIGNATURE_HEADER: sign_payload(self.webhook_secret, timestamp, raw_body),
+                }
+                session.post(self.webhook_url, data=raw_body, headers=headers, timeout=5).raise_for_status()
+                outcome = "webhooks_sent"
+            except requests.RequestException:
+                outcome = "webhooks_failed"
+            with self._lock:
+                self.stats[outcome] += 1
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parts = self.path.split("?", 1)[0].strip("/").split("/")
+                if parts == ["__mock", "stats"]:
+                    return self._reply(200, mock.snapshot())
+                if len(parts) == 3 and parts[:2] == ["pg", "orders"]:
+                    return self._api("get_order", lambda: mock.get_order(parts[2]))
+                if len(parts) == 3 and parts[:2] == ["pg", "merchants"]:
+                    return self._api("get_merchant", lambda: (200, {"merchant_id": parts[2], "status": "ACTIVE"}))
+                self._reply(404, _error("route not found", "not_found", "invalid_request_error"))
+
+            def do_POST(self):
+                parts = self.path.split("?", 1)[0].strip("/").split("/")
+                try:
+                    payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                except ValueError:
+                    return self._reply(400, _error("invalid JSON body", "request_invalid", "invalid_request_error"))
+                if len(parts) == 3 and parts[:2] == ["__mock", "orders"]:
+                    try:
+                        return self._reply(200, mock.set_status(parts[2], payload.get("order_status")))
+                    except ValueError as e:
+                        return self._reply(400, _error(str(e), "request_invalid", "invalid_request_error"))
+                if parts == ["pg", "orders"]:
+                    return self._api("create_order", lambda: mock.create_order(payload))
+                self._reply(404, _error("route not found", "not_found", "invalid_request_error"))
+
+            def _api(self, operation, handle):
+                with mock._lock:
+                    mock.stats["requests"] += 1
+                time.sleep(mock.latency[operation]())
+                if mock.check_credentials and not (self.headers.get("x-client-id") and self.headers.get("x-client-secret")):
+                    return self._reply(401, _error("authentication Failed", "request_failed", "authentication_error"))
+                roll = random.random()
+                if roll < mock.drop_rate:
+                    with mock._lock:
+                        mock.stats["dropped"] += 1
+                    self.close_connection = True
+                    return
+                if roll < mock.drop_rate + mock.error_rate:
+                    with mock._lock:
+                        mock.stats["errors"] += 1
+                    return self._reply(random.choice(mock.error_statuses),
+                                       _error("injected failure", "internal_error", "api_error"))
+                self._reply(*handle())
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def _error(message, code, error_type):
+    return {"message": message, "code": code, "type": error_type}
+
+
+def _payment_webhook(order):
+    payload = order.payload
+    return {
+        "data": {
+            "order": {
+                "order_id": payload["order_id"],
+                "order_amount": payload["order_amount"],
+                "order_currency": payload.get("order_currency", "INR"),
+                "order_tags": payload.get("order_tags"),
+            },
+            "payment": {
+                "cf_payment_id": random.randint(10 ** 9, 10 ** 10 - 1),
+                "payment_status": "SUCCESS",
+                "payment_amount": payload["order_amount"],
+                "payment_currency": payload.get("order_currency", "INR"),
+                "payment_time": _iso(order.settle_at),
+                "payment_group": "upi",
+            },
+            "customer_details": payload.get("customer_details", {}),
+        },
+        "event_time": _iso(time.time()),
+        "type": "PAYMENT_SUCCESS_WEBHOOK",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the Cashfree PG API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", default="lognormal:80,0.5", help="latency spec for every endpoint")
+    parser.add_argument("--create-latency", default=None, help="latency spec for order creation")
+    parser.add_argument("--fetch-latency", default=None, help="latency spec for order fetches")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with an error status")
+    parser.add_argument("--error-statuses", default="500,502,503")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="share of requests whose connection is dropped")
+    parser.add_argument("--paid-ratio", type=float, default=0.9, help="share of orders that end up PAID")
+    parser.add_argument("--pay-after", type=float, default=2.0, help="seconds until a paying order is PAID")
+    parser.add_argument("--expire-after", type=float, default=900.0, help="seconds until an unpaid order EXPIRES")
+    parser.add_argument("--webhook-url", default=None, help="POST payment webhooks here")
+    parser.add_argument("--webhook-secret", default=os.getenv("CASHFREE_SECRET_KEY", "your_production_secret_key"),
+                        help="key webhooks are signed with (the app's CASHFREE_SECRET_KEY)")
+    parser.add_argument("--unknown-orders", choices=("404", "create"), default="404",
+                        help="how to answer fetches for orders the mock never created")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    mock = MockCashfree(
+        host=args.host, port=args.port, latency=args.latency, create_latency=args.create_latency,
+        fetch_latency=args.fetch_latency, error_rate=args.error_rate,
+        error_statuses=[int(s) for s in args.error_statuses.split(",") if s],
+        drop_rate=args.drop_rate, paid_ratio=args.paid_ratio, pay_after=args.pay_after,
+        expire_after=args.expire_after, webhook_url=args.webhook_url, webhook_secret=args.webhook_secret,
+        unknown_orders=args.unknown_orders, seed=args.seed,
+    ).start()
+    print(f"💳 Mock Cashfree listening on {mock.base_url}")
+    print(f"   Start the app with CASHFREE_API_BASE={mock.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mock.stop()
+        print(f"📊 {json.dumps(mock.snapshot())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import hashlib
+import io
+import threading
+
+from pypdf import PdfReader, PdfWriter
+
+from cache import TTLCache
+from static_cache import file_hashes
+
+
+class ParsedPdf:
+    """A course PDF parsed once and reused for every merge.
+
+    pypdf resolves objects lazily from the underlying stream, so a reader must
+    not be used by two merges at once; merges hold `lock` while copying pages.
+    """
+
+    def __init__(self, data):
+        self.reader = PdfReader(io.BytesIO(data))
+        self.page_count = len(self.reader.pages)
+        self.lock = threading.Lock()
+
+
+class PdfMerger:
+    """Merges a generated cover sheet with stored course PDFs.
+
+    Parsed course PDFs are cached by (course_code, medium, file hash), so a
+    replaced upload is picked up automatically and only the cover page is new
+    work on each request. Finished outputs are kept briefly as well, which makes
+    a repeated download of the same document free.
+    """
+
+    def __init__(self, max_parsed=64, max_outputs=16, output_ttl=600):
+        self.parsed = TTLCache(maxsize=max_parsed, ttl=24 * 3600)
+        self.outputs = TTLCache(maxsize=max_outputs, ttl=output_ttl)
+
+    def course_pdf(self, course_code, medium, file_path):
+        key = (course_code, medium, file_hashes.digest(file_path))
+        parsed = self.parsed.get(key)
+        if parsed is None:
+            with open(file_path, "rb") as f:
+                parsed = ParsedPdf(f.read())
+            self.parsed.set(key, parsed)
+        return key, parsed
+
+    def merge(self, cover_bytes, materials):
+        """Return the merged PDF bytes.
+
+        `materials` is a list of (course_code, medium, file_path) appended after
+        the cover, in order.
+        """
+        parts = [self.course_pdf(*material) for material in materials]
+        output_key = (hashlib.sha256(cover_bytes).hexdigest(), tuple(key for key, _ in parts))
+        merged = self.outputs.get(output_key)
+        if merged is not None:
+            return merged
+
+        writer = PdfWriter()
+        writer.append(PdfReader(io.BytesIO(cover_bytes)))
+        for _, parsed in parts:
+            with parsed.lock:
+                writer.append(parsed.reader)
+        out = io.BytesIO()
+        writer.write(out)
+        merged = out.getvalue()
+        self.outputs.set(output_key, merged)
+        return merged
@@ -0,0 +1,132 @@
+import hashlib
+import hmac
+import os
+import sys
+import threading
+import time
+
+# Signed header asking for one request to be profiled (see sign_request)
+PROFILE_HEADER = "X-Profile-Request"
+
+
+class Sampler:
+    """Statistical profiler: every `interval` seconds, records the Python stack of each
+    watched thread from sys._current_frames().
+
+    Nothing is installed in the profiled threads (no settrace/setprofile), so the
+    cost to them is the GIL the sampler holds while it walks their frames, a few
+    microseconds per thread per sample. Output is the collapsed-stack format
+    ("root;caller;callee count" per line) read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval=0.01, include_idle=False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.stacks = {}
+        self.samples = 0
+        self._labels = {}
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def record(self, frame, thread_name=None):
+        names = []
+        callee = None
+        while frame is not None:
+            code = frame.f_code
+            # A waitress worker waiting on its task queue is idle, not slow
+            if code.co_name == "handler_thread" and callee is not None and \
+                    callee.co_filename.endswith("threading.py") and not self.include_idle:
+                return
+            names.append(self._label(code))
+            callee = code
+            frame = frame.f_back
+        if thread_name:
+            names.append(thread_name)
+        key = ";".join(reversed(names))
+        self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def sample(self, thread_names):
+        """Take one sample of the threads in {ident: name}"""
+        frames = sys._current_frames()
+        for ident, name in thread_names.items():
+            frame = frames.get(ident)
+            if frame is not None:
+                self.record(frame, name)
+        self.samples += 1
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in
+                       sorted(self.stacks.items(), key=lambda item: item[1], reverse=True))
+
+
+def _threads_to_watch(prefix):
+    me = threading.get_ident()
+    return {t.ident: t.name for t in threading.enumerate()
+            if t.ident != me and (not prefix or t.name.startswith(prefix))}
+
+
+def profile_threads(seconds, interval=0.01, prefix="waitress-", include_idle=False):
+    """Sample every thread whose name starts with `prefix` (all threads if empty) for
+    `seconds`, blocking the calling thread; returns the Sampler"""
+    sampler = Sampler(interval, include_idle)
+    deadline = time.monotonic() + seconds
+    threads = _threads_to_watch(prefix)
+    refreshed = time.monotonic()
+    while True:
+        now = time.monotonic()
+        if now >= deadline:
+            break
+        if now - refreshed >= 1.0:
+            # Pick up threads started after the profile began (waitress grows its pool lazily)
+            threads = _threads_to_watch(prefix)
+            refreshed = now
+        sampler.sample(threads)
+        time.sleep(interval)
+    return sampler
+
+
+class RequestProfile:
+    """Samples a single thread from a background thread until stop()"""
+
+    def __init__(self, thread_ident, interval=0.005):
+        self.thread_ident = thread_ident
+        self.sampler = Sampler(interval, include_idle=True)
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        threads = {self.thread_ident: None}
+        while not self._done.wait(self.sampler.interval):
+            self.sampler.sample(threads)
+
+    def stop(self):
+        self._done.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        return self.sampler
+
+
+def _signature(secret, method, path, expires):
+    message = f"{method.upper()} {path} {expires}".encode()
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+def sign_request(secret, method, path, ttl=300):
+    """(header value, expiry) that lets requests for this method and path be profiled until it expires"""
+    expires = int(time.time()) + ttl
+    return f"{expires}.{_signature(secret, method, path, expires)}", expires
+
+
+def verify_request(secret, value, method, path):
+    """True if `value` was made by sign_request for this method and path and has not expired"""
+    expires, _, signature = (value or "").partition(".")
+    if not secret or not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _signature(secret, method, path, int(expires)))
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Payment reconciliation for orders stuck in 'pending'
+Asks the gateway for the status of every pending order (e.g. when the student
+closed the tab before /payment-success and no webhook arrived), applies the
+changes in one transaction per page and writes a summary report.
+
+Usage: python reconcile.py [--workers 16] [--rate 50] [--page-size 500] [--min-age 900]
+                           [--limit N] [--dry-run] [--report reconcile_report.json]
+                           [--every SECONDS] [--base-url URL]
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from database import ASSIGNMENT_STATUS_BY_ORDER_STATUS, db
+from gateway import CashfreeClient, GatewayError, GatewayUnavailable
+
+# Keep this many failures in the report; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+
+class RateLimiter:
+    """Token bucket shared by all workers: at most `rate` calls per second on average"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate or self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class Reconciler:
+    """Pages through pending assignments and settles them against the gateway.
+
+    Each page of order ids is fetched concurrently by `workers` threads, all
+    sharing one `rate` limit, and the terminal statuses found (PAID, EXPIRED,
+    TERMINATED) are written in a single transaction. Orders younger than
+    `min_age` seconds are skipped so live checkouts are not touched.
+    """
+
+    def __init__(self, database, client, workers=8, rate=20, page_size=500, min_age=900):
+        self.db = database
+        self.client = client
+        self.workers = workers
+        self.rate_limiter = RateLimiter(rate)
+        self.page_size = page_size
+        self.min_age = min_age
+
+    def check_order(self, order_id):
+        """Return (order_id, order_status, error) for one order"""
+        self.rate_limiter.acquire()
+        try:
+            response = self.client.get_order(order_id)
+        except GatewayUnavailable as e:
+            return order_id, None, f"gateway unavailable ({e})"
+        except GatewayError as e:
+            return order_id, None, str(e)
+        if response.status_code == 404:
+            return order_id, None, "not found"
+        if response.status_code != 200:
+            return order_id, None, f"HTTP {response.status_code}"
+        try:
+            return order_id, response.json().get("order_status"), None
+        except ValueError:
+            return order_id, None, "invalid JSON from gateway"
+
+    def run(self, limit=None, dry_run=False):
+        """Reconcile up to `limit` pending orders and return the summary report"""
+        started = time.perf_counter()
+        report = {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "dry_run": dry_run,
+            "checked": 0,
+            "updated": {},
+            "unchanged": 0,
+            "not_found": 0,
+            "errors": 0,
+            "error_samples": [],
+            "pages": 0,
+        }
+
+        after_id = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="reconcile") as pool:
+            while True:
+                page_size = self.page_size
+                if limit is not None:
+                    page_size = min(page_size, limit - report["checked"])
+                    if page_size <= 0:
+                        break
+                page = self.db.get_pending_order_ids(after_id, page_size, self.min_age)
+                if not page["success"]:
+                    raise RuntimeError(page["error"])
+                if not page["order_ids"]:
+                    break
+
+                order_statuses = {}
+                for order_id, status, error in pool.map(self.check_order, page["order_ids"]):
+                    report["checked"] += 1
+                    if error == "not found":
+                        report["not_found"] += 1
+                    elif error:
+                        report["errors"] += 1
+                        if len(report["error_samples"]) < MAX_REPORTED_ERRORS:
+                            report["error_samples"].append({"order_id": order_id, "error": error})
+                    elif status in ASSIGNMENT_STATUS_BY_ORDER_STATUS:
+                        order_statuses[order_id] = status
+                        report["updated"][status] = report["updated"].get(status, 0) + 1
+                    else:
+                        report["unchanged"] += 1
+
+                if order_statuses and not dry_run:
+                    applied = self.db.apply_order_statuses(order_statuses)
+                    if not applied["success"]:
+                        raise RuntimeError(applied["error"])
+
+                report["pages"] += 1
+                if page["next_after_id"] is None:
+                    break
+                after_id = page["next_after_id"]
+
+        elapsed = time.perf_counter() - started
+        report["finished_at"] = datetime.now(timezone.utc).isoformat()
+        report["duration_seconds"] = round(elapsed, 3)
+        report["orders_per_second"] = round(report["checked"] / elapsed, 1) if elapsed else 0.0
+        return report
+
+
+class ReconcileSchedule:
+    """Runs a Reconciler every `interval` seconds on a daemon thread"""
+
+    def __init__(self, reconciler, interval):
+        self.reconciler = reconciler
+        self.interval = interval
+        self.last_report = None
+        self.last_error = None
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="reconcile-schedule", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            try:
+                self.last_report = self.reconciler.run()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+
+    def snapshot(self):
+        return {"interval": self.interval, "last_report": self.last_report, "last_error": self.last_error}
+
+
+def write_report(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def print_report(report):
+    mode = " (dry run, nothing written)" if report["dry_run"] else ""
+    print(f"🔎 Checked {report['checked']:,} pending orders in {report['duration_seconds']}s "
+          f"({report['orders_per_second']}/s){mode}")
+    for status, count in sorted(report["updated"].items()):
+        print(f"✅ {status}: {count:,}")
+    print(f"⏳ Still active: {report['unchanged']:,}")
+    if report["not_found"]:
+        print(f"❓ Not found at gateway: {report['not_found']:,}")
+    if report["errors"]:
+        print(f"❌ Errors: {report['errors']:,} (first: {report['error_samples'][0]['error']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile pending orders with the payment gateway")
+    parser.add_argument("--workers", type=int, default=16, help="concurrent gateway requests")
+    parser.add_argument("--rate", type=float, default=50, help="max gateway requests per second (0 = unlimited)")
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--min-age", type=int, default=900, help="skip orders younger than this many seconds")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many orders")
+    parser.add_argument("--dry-run", action="store_true", help="report changes without writing them")
+    parser.add_argument("--report", default="reconcile_report.json", help="where to write the JSON summary")
+    parser.add_argument("--every", type=int, default=0, help="repeat every N seconds (0 = run once)")
+    parser.add_argument("--base-url", default=os.getenv("CASHFREE_API_BASE"),
+                        help="gateway base URL, e.g. a local mock (default: $CASHFREE_API_BASE)")
+    args = parser.parse_args()
+
+    client_options = {"max_in_flight": args.workers, "pool_size": args.workers}
+    if args.base_url:
+        client_options["base_url"] = args.base_url
+    client = CashfreeClient(
+        os.getenv("CASHFREE_APP_ID", "your_production_app_id"),
+        os.getenv("CASHFREE_SECRET_KEY", "your_production_secret_key"),
+        **client_options
+    )
+    reconciler = Reconciler(db, client, workers=args.workers, rate=args.rate,
+                            page_size=args.page_size, min_age=args.min_age)
+
+    while True:
+        report = reconciler.run(limit=args.limit, dry_run=args.dry_run)
+        report["gateway"] = client.metrics.snapshot()
+        write_report(report, args.report)
+        print_report(report)
+        print(f"📄 Report written to {args.report}")
+        if not args.every:
+            break
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import gzip
+import hashlib
+import os
+import threading
+
+from flask import Response, abort, current_app, send_file
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+class _PageVersion:
+    """One loaded version of a page with its pre-compressed variants"""
+
+    def __init__(self, body, mtime):
+        self.mtime = mtime
+        self.etag = hashlib.sha1(body).hexdigest()
+        # (content-encoding, body, etag); strong ETags must differ per encoding
+        self.variants = {None: (body, self.etag)}
+        self.variants["gzip"] = (gzip.compress(body, compresslevel=9, mtime=0), self.etag + "-gz")
+        if brotli is not None:
+            self.variants["br"] = (brotli.compress(body), self.etag + "-br")
+
+
+class CachedPage:
+    """A static page read and preprocessed once, then served from memory.
+
+    Responses carry an ETag (so browsers revalidate with a 304 instead of
+    downloading again) and use a pre-compressed brotli/gzip body when the
+    client accepts it. With `reload=True` the file's mtime is checked on each
+    request, which is what the debug server wants.
+    """
+
+    def __init__(self, path, preprocess=None, mimetype="text/html", cache_control="private, no-cache"):
+        self.path = path
+        self.preprocess = preprocess
+        self.mimetype = mimetype
+        self.cache_control = cache_control
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        mtime = os.path.getmtime(self.path)
+        with open(self.path, "r", encoding="utf-8") as f:
+            content = f.read()
+        if self.preprocess is not None:
+            content = self.preprocess(content)
+        return _PageVersion(content.encode("utf-8"), mtime)
+
+    def current(self, reload=False):
+        version = self._version
+        if version is None or (reload and os.path.getmtime(self.path) != version.mtime):
+            with self._lock:
+                version = self._version
+                if version is None or (reload and os.path.getmtime(self.path) != version.mtime):
+                    version = self._version = self._load()
+        return version
+
+    def respond(self, request, reload=False):
+        version = self.current(reload=reload)
+        encoding = None
+        if "br" in version.variants and request.accept_encodings["br"]:
+            encoding = "br"
+        elif request.accept_encodings["gzip"]:
+            encoding = "gzip"
+        body, etag = version.variants[encoding]
+
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype=self.mimetype)
+            if encoding:
+                response.headers["Content-Encoding"] = encoding
+        response.set_etag(etag)
+        response.headers["Vary"] = "Accept-Encoding"
+        response.headers["Cache-Control"] = self.cache_control
+        return response
+
+
+# One year; content-addressed URLs never change content
+IMMUTABLE_MAX_AGE = 31536000
+# Length of the hash prefix used in ?v= on content-addressed URLs
+VERSION_LENGTH = 16
+
+
+class FileHashes:
+    """SHA-256 of files on disk, recomputed only when a file's size or mtime changes"""
+
+    def __init__(self):
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    def digest(self, path, stat=None):
+        """Hex SHA-256 of `path`; pass a known os.stat() result to skip the stat call"""
+        if stat is None:
+            stat = os.stat(path)
+        key = (stat.st_size, stat.st_mtime_ns)
+        cached = self._digests.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        with self._lock:
+            self._digests[path] = (key, digest)
+        return digest
+
+    def forget(self, path):
+        with self._lock:
+            self._digests.pop(path, None)
+
+
+file_hashes = FileHashes()
+
+
+def versioned_url(url, path, stat=None):
+    """Content-addressed form of `url` for the file at `path` (cacheable forever)"""
+    return f"{url}?v={file_hashes.digest(path, stat=stat)[:VERSION_LENGTH]}"
+
+
+def send_hashed_file(path, request, mimetype=None, private=False):
+    """Send a file with a content-hash ETag, conditional GET and Range support.
+
+    304s for If-None-Match / If-Modified-Since and 206s for Range requests come
+    from Werkzeug's conditional handling. When the URL carries the file's own
+    hash in ?v= the response is marked immutable for a year.
+    """
+    digest = file_hashes.digest(path)
+    version = request.args.get("v", "")
+    if not private and len(version) >= VERSION_LENGTH and digest.startswith(version):
+        response = send_file(path, mimetype=mimetype, etag=digest, conditional=True, max_age=IMMUTABLE_MAX_AGE)
+        response.cache_control.immutable = True
+    else:
+        # Revalidate every time (no-cache); an unchanged file costs a 304 with no body
+        response = send_file(path, mimetype=mimetype, etag=digest, conditional=True)
+        if private:
+            response.cache_control.private = True
+        else:
+            response.cache_control.public = True
+    return response
+
+
+def send_directory_file(directory, filename, request):
+    """send_from_directory() equivalent built on send_hashed_file()"""
+    path = safe_join(os.path.join(current_app.root_path, directory), filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    return send_hashed_file(path, request)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Checks that a request verifies the user/admin session at most once.
+"""
+
+from app import app
+from database import db
+
+
+def login_client():
+    client = app.test_client()
+    db.register_user("Context User", "context@example.com", "9000000001", "password123")
+    response = client.post("/api/login", json={"email": "context@example.com", "password": "password123"})
+    assert response.json["success"]
+    return client
+
+
+def test_dashboard_verifies_session_once():
+    client = login_client()
+    db.session_cache.clear()
+
+    response = client.get("/dashboard")
+    assert response.status_code == 200
+    # Decorator and handler share one verification: a single JOIN, nothing else
+    assert db.query_stats.count == 1
+
+    response = client.get("/dashboard")
+    assert response.status_code == 200
+    # Warm session cache: no SQL at all
+    assert db.query_stats.count == 0
+
+
+def test_admin_route_verifies_session_once():
+    client = app.test_client()
+    response = client.post("/api/admin/login", json={"username": "admin", "password": "admin123"})
+    assert response.json["success"]
+    db.admin_session_cache.clear()
+
+    response = client.get("/api/admin/programs")
+    assert response.status_code == 200
+    # One admin session lookup plus the programs query
+    assert db.query_stats.count == 2
+
+
+def test_logged_out_dashboard_is_rejected():
+    client = login_client()
+    client.post("/api/logout")
+    response = client.get("/dashboard")
+    assert response.status_code == 401
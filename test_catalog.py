@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Checks that course changes made through one Database reach another process's
+catalog snapshot through the catalog_version row.
+"""
+
+import json
+import os
+import tempfile
+
+from database import Database
+
+
+def filtered_codes(database, program):
+    body = database.catalog.snapshot().filter_json(program=program)
+    return {course["course_code"] for course in json.loads(body)["courses"]}
+
+
+def test_second_database_sees_course_changes():
+    path = os.path.join(tempfile.mkdtemp(), "catalog.db")
+    writer = Database(path)
+    reader = Database(path)
+    # Re-read the version row on every snapshot() instead of once a second
+    reader.catalog.check_interval = 0
+    assert "XPC-001" not in filtered_codes(reader, "MBA")
+
+    course_id = writer.add_course("XPC-001", "Cross Process", "MBA", "1st Year", "Yearly")["course_id"]
+    assert "XPC-001" in filtered_codes(reader, "MBA")
+
+    writer.update_course(course_id, course_name="Cross Process Renamed")
+    assert reader.catalog.snapshot().courses_by_code("XPC-001")[0]["course_name"] == "Cross Process Renamed"
+
+    # Inactive courses drop out of the filter but can still be looked up by code
+    writer.update_course(course_id, is_active=0)
+    assert "XPC-001" not in filtered_codes(reader, "MBA")
+    assert reader.catalog.snapshot().courses_by_code("XPC-001")[0]["is_active"] == 0
+
+    writer.delete_course(course_id)
+    assert reader.catalog.snapshot().courses_by_code("XPC-001") == ()
+    assert reader.catalog.snapshot().version == writer.get_catalog_version()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Runs the checkout flow through the Flask app against mock_cashfree.py.
+"""
+
+import app as portal
+from gateway import CashfreeClient
+from mock_cashfree import MockCashfree
+
+CHECKOUT_FORM = {
+    "courses": ["MMPC-001", "MMPC-002"],
+    "studentName": "Checkout User",
+    "enrollmentNumber": "123456789",
+    "mobileNumber": "9000000005",
+    "emailId": "checkout@example.com",
+}
+
+
+def test_checkout_against_mock_gateway():
+    mock = MockCashfree(latency="fixed:5", paid_ratio=0.0).start()
+    original_client = portal.cashfree
+    portal.cashfree = CashfreeClient("id", "secret", base_url=mock.base_url)
+    try:
+        client = portal.app.test_client()
+        client.post("/api/register", json={"name": "Checkout User", "email": "checkout@example.com",
+                                           "mobile": "9000000005", "password": "password123"})
+        assert client.post("/api/login", json={"email": "checkout@example.com",
+                                               "password": "password123"}).status_code == 200
+
+        response = client.post("/initiate-payment", json=CHECKOUT_FORM)
+        assert response.status_code == 200, response.get_json()
+        order_id = response.get_json()["transactionId"]
+
+        # Not paid yet: the order stays unpaid and no payment data is exposed
+        assert "Order status: ACTIVE" in client.get(f"/payment-success?order_id={order_id}").get_data(as_text=True)
+        assert client.get("/api/payment-data").get_json()["success"] is False
+
+        mock.set_status(order_id, "PAID")
+        assert client.get(f"/payment-success?order_id={order_id}").status_code == 302
+        payment = client.get("/api/payment-data").get_json()
+        assert payment["success"] is True and payment["payment_data"]["courses"] == CHECKOUT_FORM["courses"]
+        assert portal.db.get_payment_order(order_id)["order"]["status"] == "PAID"
+        assert mock.snapshot()["created"] == 1
+
+        # Another student cannot attach this order to their session or read its details
+        other = portal.app.test_client()
+        other.post("/api/register", json={"name": "Other User", "email": "other-checkout@example.com",
+                                          "mobile": "9000000006", "password": "password123"})
+        other.post("/api/login", json={"email": "other-checkout@example.com", "password": "password123"})
+        assert other.get(f"/payment-success?order_id={order_id}").status_code == 403
+        assert other.get("/api/payment-data").status_code == 404
+        assert other.get(f"/payment-status/{order_id}").status_code == 404
+        assert other.get(f"/check-payment/{order_id}").status_code == 404
+    finally:
+        portal.cashfree = original_client
+        mock.stop()
+
+
+def test_payment_success_is_never_shed():
+    original_client = portal.cashfree
+    portal.cashfree = CashfreeClient("id", "secret", base_url="http://127.0.0.1:9/pg", max_in_flight=1)
+    original_wait = portal.PAYMENT_SUCCESS_GATEWAY_WAIT
+    portal.PAYMENT_SUCCESS_GATEWAY_WAIT = 0.2
+    try:
+        portal.db.create_payment_order("ORDSHED1", None, 1, {"courses": ["MMPC-001"]})
+        client = portal.app.test_client()
+        with client.session_transaction() as browser_session:
+            browser_session["order_id"] = "ORDSHED1"
+
+        # Every gateway slot busy: the student gets a self-refreshing page, not a JSON 503
+        portal.cashfree.limiter.acquire()
+        response = client.get("/payment-success?order_id=ORDSHED1")
+        portal.cashfree.limiter.release()
+        assert response.status_code == 503 and response.mimetype == "text/html"
+        assert 'http-equiv="refresh"' in response.get_data(as_text=True) and response.headers["Retry-After"]
+    finally:
+        portal.cashfree = original_client
+        portal.PAYMENT_SUCCESS_GATEWAY_WAIT = original_wait
+
+
+def test_cached_orders_are_not_shared_with_callers():
+    db = portal.db
+    user = db.register_user("Cache User", "ordercache@example.com", "9000000007", "password123")
+    request_data = {"courses": ["MMPC-001"]}
+    db.create_payment_order("ORDCACHE1", user["user_id"], 1, request_data)
+    request_data["courses"].append("MMPC-999")
+
+    order = db.get_payment_order("ORDCACHE1")["order"]
+    order["request"]["courses"].append("MMPC-998")
+    db.update_payment_order("ORDCACHE1", "PAID", {"status": "PAID"})
+    db.get_payment_order("ORDCACHE1")["order"]["payment"].setdefault("tampered", True)
+
+    order = db.get_payment_order("ORDCACHE1")["order"]
+    assert order["request"] == {"courses": ["MMPC-001"]}
+    assert order["payment"] == {"status": "PAID"} and order["status"] == "PAID"
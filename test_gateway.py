@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Drives the gateway client's circuit breaker and in-flight limit against a failing
+mock_cashfree.py, and checks gateway-bound routes answer 503 with Retry-After.
+"""
+
+import time
+
+import pytest
+
+import app as portal
+from gateway import CashfreeClient, CircuitBreaker, GatewayUnavailable
+from mock_cashfree import MockCashfree
+
+
+def failing_client(mock, **kwargs):
+    return CashfreeClient("id", "secret", base_url=mock.base_url, max_retries=0,
+                          failure_threshold=2, reset_timeout=0.3, **kwargs)
+
+
+def test_breaker_opens_probes_and_closes():
+    mock = MockCashfree(latency="fixed:0", error_rate=1.0).start()
+    try:
+        client = failing_client(mock)
+        for _ in range(2):
+            assert client.get_order("ORDBREAK").status_code >= 500
+        assert client.breaker.snapshot()["state"] == "open"
+        with pytest.raises(GatewayUnavailable) as refused:
+            client.get_order("ORDBREAK")
+        assert refused.value.retry_after >= 1
+        assert mock.stats["errors"] == 2  # the refused call never reached the gateway
+
+        # After reset_timeout one probe goes through; a failing probe re-opens the breaker
+        time.sleep(0.35)
+        assert client.breaker.snapshot()["state"] == "half_open"
+        assert client.get_order("ORDBREAK").status_code >= 500
+        snapshot = client.breaker.snapshot()
+        assert snapshot["state"] == "open" and snapshot["times_opened"] == 2
+
+        # A successful probe (any non-5xx answer) closes it again
+        time.sleep(0.35)
+        mock.error_rate = 0.0
+        assert client.get_order("ORDBREAK").status_code == 404
+        assert client.breaker.snapshot() == {"state": "closed", "consecutive_failures": 0,
+                                             "times_opened": 2, "retry_after": 0}
+    finally:
+        mock.stop()
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    breaker.before_call()
+    with pytest.raises(GatewayUnavailable):
+        breaker.before_call()
+    breaker.record_success()
+    breaker.before_call()
+
+
+def test_gateway_bound_routes_answer_503_with_retry_after():
+    mock = MockCashfree(latency="fixed:0", error_rate=1.0).start()
+    original_client = portal.cashfree
+    portal.cashfree = failing_client(mock, max_in_flight=1, acquire_timeout=0.05)
+    try:
+        client = portal.app.test_client()
+
+        # No free in-flight slot within acquire_timeout
+        portal.cashfree.limiter.acquire()
+        try:
+            response = client.get("/check-cashfree-config")
+        finally:
+            portal.cashfree.limiter.release()
+        assert response.status_code == 503 and response.headers["Retry-After"] == "2"
+        assert portal.cashfree.limiter.snapshot()["rejected"] == 1
+
+        # Circuit open: refused before the route runs
+        for _ in range(2):
+            portal.cashfree.get_order("ORDBREAK")
+        response = client.get("/check-cashfree-config")
+        assert response.status_code == 503 and int(response.headers["Retry-After"]) >= 1
+        assert response.json["retry_after"] >= 1
+    finally:
+        portal.cashfree = original_client
+        mock.stop()
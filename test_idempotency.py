@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Checks that duplicate submissions share one execution of the operation.
+"""
+
+import threading
+import time
+
+from idempotency import IdempotencyStore, derive_key
+
+
+def test_concurrent_duplicates_run_once():
+    store = IdempotencyStore()
+    calls = []
+
+    def create_order():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"order_id": "ORD1"}
+
+    results = []
+
+    def submit():
+        results.append(store.run("key", create_order))
+
+    threads = [threading.Thread(target=submit) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(result == {"order_id": "ORD1"} for result, _ in results)
+    assert sorted(replayed for _, replayed in results) == [False, True, True, True, True]
+    # Completed result is replayed later too
+    assert store.run("key", create_order) == ({"order_id": "ORD1"}, True)
+
+
+def test_failed_results_are_not_kept():
+    store = IdempotencyStore(should_store=lambda result: result["ok"])
+    outcomes = iter([{"ok": False}, {"ok": True}])
+    assert store.run("key", lambda: next(outcomes)) == ({"ok": False}, False)
+    assert store.run("key", lambda: next(outcomes)) == ({"ok": True}, False)
+
+
+def test_derived_keys_ignore_field_order_but_not_scope():
+    assert derive_key(1, {"a": 1, "b": [2]}) == derive_key(1, {"b": [2], "a": 1})
+    assert derive_key(1, {"a": 1}) != derive_key(2, {"a": 1})
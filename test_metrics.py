@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Checks the per-thread metrics registry and the /metrics endpoint.
+"""
+
+import threading
+
+import app as portal
+from metrics import Metrics
+
+
+def test_shards_are_summed_across_threads():
+    registry = Metrics()
+    registry.describe("jobs_total", "counter", "Jobs done")
+    registry.describe("job_seconds", "histogram", "Job time", (0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            registry.inc("jobs_total", (("kind", "a"),))
+            registry.observe("job_seconds", 0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    text = registry.render()
+    assert "# TYPE jobs_total counter" in text
+    assert 'jobs_total{kind="a"} 4000' in text
+    assert 'job_seconds_bucket{le="0.1"} 0' in text
+    assert 'job_seconds_bucket{le="1"} 4000' in text
+    assert 'job_seconds_bucket{le="+Inf"} 4000' in text
+    assert "job_seconds_count 4000" in text and "job_seconds_sum 2000" in text
+
+
+def test_metrics_endpoint_reports_routes(monkeypatch):
+    client = portal.app.test_client()
+    client.get("/api/course-material/NOPE-001?medium=english")
+    client.get("/api/course-material/NOPE-002?medium=english")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    text = response.get_data(as_text=True)
+    # One series per URL rule, not per path
+    assert 'app_requests_total{route="/api/course-material/<course_code>",method="GET",status="404"} ' in text
+    assert 'app_request_duration_seconds_count{route="/api/course-material/<course_code>"} ' in text
+    assert 'app_requests_in_flight{route="/api/course-material/<course_code>"} 0' in text
+    assert 'app_requests_in_flight{route="/metrics"} 1' in text
+    assert 'app_cache_hit_ratio{cache="session"}' in text
+    assert 'app_gateway_circuit_state{state="closed"} 1' in text
+
+    monkeypatch.setattr(portal, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
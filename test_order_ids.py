@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Checks that order IDs are unique and ordered, across threads and node ids.
+"""
+
+import os
+import tempfile
+import threading
+
+import pytest
+
+from database import Database
+from ids import MAX_SEQUENCE, NodeLease, SnowflakeGenerator, parse_id
+
+
+def test_ids_are_unique_and_increasing():
+    generator = SnowflakeGenerator(node_id=7)
+    ids = [generator.next_id() for _ in range(20000)]
+    assert ids == sorted(set(ids))
+    assert all(parse_id(i)[1] == 7 for i in ids)
+
+
+def test_sequence_overflow_borrows_next_millisecond():
+    generator = SnowflakeGenerator(node_id=0)
+    # More IDs than one millisecond can hold, reserved in one go
+    ids = generator.next_ids(MAX_SEQUENCE * 3)
+    ids.append(generator.next_id())
+    assert ids == sorted(set(ids))
+
+
+def test_threads_never_share_an_id():
+    generator = SnowflakeGenerator(node_id=1)
+    results = []
+
+    def worker():
+        results.extend([generator.next_id() for _ in range(5000)])
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(set(results)) == 40000
+
+
+def test_nodes_do_not_collide_and_order_ids_sort_by_time():
+    a = SnowflakeGenerator(node_id=1)
+    b = SnowflakeGenerator(node_id=2)
+    ids = set(a.next_ids(5000)) | set(b.next_ids(5000))
+    assert len(ids) == 10000
+
+    first, second = a.next_order_id(), a.next_order_id()
+    assert first.startswith("ORD") and len(first) == len(second) == 22
+    assert first < second
+
+
+def test_leased_nodes_are_unique_until_they_lapse():
+    database = Database(os.path.join(tempfile.mkdtemp(), "nodes.db"))
+    first, second = NodeLease(database), NodeLease(database)
+    assert (first.node_id, second.node_id) == (0, 1)
+    with pytest.raises(ValueError):
+        SnowflakeGenerator()
+
+    # A node nobody renewed within the lease goes to the next claimant...
+    with database.pool.connection() as conn:
+        conn.execute("UPDATE order_id_nodes SET renewed_at = '2000-01-01 00:00:00' WHERE node_id = 0")
+        conn.commit()
+    third = NodeLease(database)
+    assert third.node_id == 0
+
+    # ...and the process that lost it stops issuing IDs from it
+    generator = SnowflakeGenerator(lease=first)
+    assert not first.renew()
+    with pytest.raises(RuntimeError):
+        generator.next_id()
+    assert SnowflakeGenerator(lease=third).next_id()
+    for lease in (first, second, third):
+        lease.release()
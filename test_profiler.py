@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Checks the sampling profiler and the signed single-request profile header.
+"""
+
+import threading
+import time
+
+import app as portal
+from profiler import PROFILE_HEADER, profile_threads, sign_request, verify_request
+
+
+def spin_for_profile(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_profile_threads_collapses_worker_stacks():
+    stop = threading.Event()
+    worker = threading.Thread(target=spin_for_profile, args=(stop,), name="waitress-test")
+    worker.start()
+    try:
+        sampler = profile_threads(0.3, interval=0.005)
+    finally:
+        stop.set()
+        worker.join()
+    assert sampler.samples > 10
+    stack, count = sampler.collapsed().splitlines()[0].rsplit(" ", 1)
+    assert stack.startswith("waitress-test;") and "spin_for_profile (test_profiler.py:" in stack
+    assert int(count) > 0
+
+
+def test_signed_header_profiles_one_request(monkeypatch):
+    monkeypatch.setattr(portal, "PROFILE_SECRET", "profile-secret")
+    value, _ = sign_request("profile-secret", "GET", "/api/courses/filter")
+    assert verify_request("profile-secret", value, "GET", "/api/courses/filter")
+    assert not verify_request("profile-secret", value, "GET", "/api/admin/users")
+    assert not verify_request("other-secret", value, "GET", "/api/courses/filter")
+
+    client = portal.app.test_client()
+    assert "X-Profile-Id" not in client.get("/api/courses/filter").headers
+    response = client.get("/api/courses/filter", headers={PROFILE_HEADER: value})
+    profile_id = response.headers["X-Profile-Id"]
+
+    assert client.get(f"/api/admin/profile/{profile_id}").status_code == 401
+    client.post("/api/admin/login", json={"username": "admin", "password": "admin123"})
+    result = client.get(f"/api/admin/profile/{profile_id}?format=json").json
+    assert result["path"] == "/api/courses/filter" and result["status"] == response.status_code
+
+    minted = client.post("/api/admin/profile/request-token", json={"path": "/api/courses/filter"}).json
+    assert minted["header"] == PROFILE_HEADER and verify_request("profile-secret", minted["value"], "GET", "/api/courses/filter")
+
+
+def test_admin_profile_endpoint():
+    client = portal.app.test_client()
+    client.post("/api/admin/login", json={"username": "admin", "password": "admin123"})
+    started = time.monotonic()
+    response = client.get("/api/admin/profile?seconds=0.2&threads=all")
+    assert response.status_code == 200 and time.monotonic() - started >= 0.2
+    assert int(response.headers["X-Profile-Samples"]) > 0
+    assert client.get("/api/admin/profile?seconds=1000").status_code == 400
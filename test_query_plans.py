@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Runs EXPLAIN QUERY PLAN on every statement the Database methods issue and
+fails if any of them falls back to a full table scan.
+"""
+
+import re
+
+from database import db
+
+# "SCAN users" is a full table scan; "SCAN users USING [COVERING] INDEX ..." is not
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+# Statements that read a whole table on purpose
+INTENTIONAL_SCANS = (
+    # Course catalog snapshot rebuild (catalog.py) loads every course
+    re.compile(r"FROM courses$"),
+)
+
+
+def exercise_database():
+    """Call every Database method so each of its statements is traced"""
+    db.register_user("Plan User", "plan@example.com", "9000000002", "password123")
+    db.register_user("Plan User", "plan@example.com", "9000000002", "password123")
+    db.register_user("Plan User 2", "plan2@example.com", "9000000002", "password123")
+    login = db.login_user("plan@example.com", "password123")
+    db.login_user("plan@example.com", "wrong-password")
+    user_id = login["user"]["id"]
+    db.session_cache.clear()
+    db.verify_session(login["session_token"])
+    db.save_assignment_request(user_id, ["MMPC-001", "MMPC-002"], "ORDPLAN1", 2)
+    db.create_payment_order("ORDPLAN2", user_id, 1, {"courses": ["MMPC-001"]})
+    db.order_cache.clear()
+    db.get_payment_order("ORDPLAN2")
+    db.update_payment_order("ORDPLAN2", "PAID", {"status": "PAID"})
+    db.enqueue_webhook_event("ORDPLAN2", '{"order_id": "ORDPLAN2", "order_status": "PAID"}')
+    db.claim_webhook_events(10)
+    db.apply_webhook_batch({"ORDPLAN2": "PAID"}, [1])
+    db.get_webhook_queue_stats()
+    db.get_pending_order_ids(0, 10)
+    db.apply_order_statuses({"ORDPLAN2": "PAID"})
+    db.logout_user(login["session_token"])
+
+    db.register_admin("planadmin", "planadmin@example.com", "password123", "Plan Admin")
+    db.register_admin("planadmin", "planadmin@example.com", "password123", "Plan Admin")
+    admin_login = db.login_admin("planadmin", "password123")
+    db.admin_session_cache.clear()
+    db.verify_admin_session(admin_login["session_token"])
+    db.logout_admin(admin_login["session_token"])
+    db.create_default_admin()
+
+    db.get_all_users(limit=10, offset=0)
+    db.update_user_status(user_id, 1)
+    db.get_assignment_statistics()
+
+    added = db.add_course("PLAN-001", "Plan Course", "MBA", "1st Year", "", "PLAN-001.pdf")
+    db.get_all_courses(limit=10, offset=0)
+    db.get_courses_by_filter(program="MBA")
+    db.get_courses_by_filter(program="MBA", year="1st Year")
+    db.get_courses_by_filter(program="MBA", year="1st Year", semester="Yearly")
+    db.get_courses_by_filter(program="MBA", semester="1st Semester")
+    db.get_courses_by_filter(program="MBA", year="1st Year", is_active=None)
+    db.update_course(added["course_id"], course_name="Plan Course Renamed")
+    db.get_course_by_code("PLAN-001")
+    db.get_courses_by_code_all("PLAN-001")
+    db.delete_course(added["course_id"])
+
+    center = db.add_study_center("PLAN01", "Plan Centre", "1 Plan Road", "Delhi", "Delhi", "110001")
+    db.add_study_center("PLAN01", "Plan Centre", "1 Plan Road")
+    db.get_study_centers(limit=10, offset=0)
+    db.update_study_center(center["center_id"], name="Plan Centre Renamed")
+    db.delete_study_center(center["center_id"])
+
+    db.add_program("PLANPRG", "Plan Programme")
+    db.add_program("PLANPRG", "Plan Programme")
+    db.get_all_programs()
+    db.initialize_default_data()
+
+
+def traced_statements():
+    statements = []
+    with db.pool.connection() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            exercise_database()
+        finally:
+            conn.set_trace_callback(None)
+    return [
+        sql for sql in statements
+        if sql.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE")
+        and not any(p.search(" ".join(sql.split())) for p in INTENTIONAL_SCANS)
+    ]
+
+
+def test_every_query_uses_an_index():
+    statements = traced_statements()
+    assert len(statements) > 30
+
+    offenders = []
+    with db.pool.connection() as conn:
+        for sql in statements:
+            for row in conn.execute("EXPLAIN QUERY PLAN " + sql):
+                detail = row[-1]
+                if FULL_SCAN.match(detail):
+                    offenders.append(f"{detail}: {' '.join(sql.split())}")
+    assert not offenders, "Full table scans:\n" + "\n".join(offenders)
+
+
+def test_public_course_filter_uses_partial_index():
+    with db.pool.connection() as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM courses WHERE 1=1 AND program = ? AND year = ? "
+            "AND semester IN (?, '') AND is_active = 1 ORDER BY course_code",
+            ("MBA", "1st Year", "Yearly")
+        ).fetchall()
+    assert any("idx_courses_active_filter" in row[-1] for row in plan)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Checks per-request SQL counting, timing headers and the query budget log.
+"""
+
+import app as portal
+from database import db
+
+
+def admin_client():
+    client = portal.app.test_client()
+    response = client.post("/api/admin/login", json={"username": "admin", "password": "admin123"})
+    assert response.json["success"]
+    return client
+
+
+def test_headers_only_outside_production(monkeypatch):
+    client = admin_client()
+
+    monkeypatch.setattr(portal, "DB_DEBUG_HEADERS", False)
+    response = client.get("/api/admin/statistics")
+    assert response.status_code == 200
+    assert "X-DB-Queries" not in response.headers
+
+    monkeypatch.setattr(portal, "DB_DEBUG_HEADERS", True)
+    db.admin_session_cache.clear()
+    response = client.get("/api/admin/statistics")
+    assert int(response.headers["X-DB-Queries"]) == db.query_stats.count >= 6
+    assert float(response.headers["X-DB-Time"]) >= 0
+
+
+def test_repeated_statements_are_reported(monkeypatch, capsys):
+    monkeypatch.setattr(portal, "DB_QUERY_BUDGET", 0)
+    monkeypatch.setattr(portal, "DB_TIME_BUDGET_MS", 0)
+    monkeypatch.setattr(portal, "DB_REPEAT_BUDGET", 3)
+
+    db.query_stats.reset()
+    with db.pool.connection() as conn:
+        for user_id in range(3):
+            conn.execute("SELECT name FROM users WHERE id = ?", (user_id,)).fetchone()
+    sql, executions, seconds = db.query_stats.repeated(3)[0]
+    assert sql == "SELECT name FROM users WHERE id = ?" and executions == 3 and seconds >= 0
+
+    # A request within every budget logs nothing
+    admin_client().get("/api/admin/programs")
+    assert "DB budget exceeded" not in capsys.readouterr().out
+
+    monkeypatch.setattr(portal, "DB_QUERY_BUDGET", 1)
+    admin_client().get("/api/admin/statistics")
+    assert "DB budget exceeded: GET /api/admin/statistics" in capsys.readouterr().out
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Checks that reconciliation settles pending orders against a local mock gateway.
+"""
+
+from database import db
+from gateway import CashfreeClient
+from mock_cashfree import MockCashfree
+from reconcile import Reconciler
+
+
+def test_pending_orders_are_settled_in_pages():
+    mock = MockCashfree().start()
+    try:
+        user = db.register_user("Rec User", "rec@example.com", "9000000004", "password123")
+        for order_id in ("ORDREC1", "ORDREC2", "ORDREC3", "ORDREC4"):
+            db.create_payment_order(order_id, user["user_id"], 10, {"courses": ["MMPC-001"]})
+        # ORDREC4 was never created at the gateway
+        mock.set_status("ORDREC1", "PAID")
+        mock.set_status("ORDREC2", "EXPIRED")
+        mock.set_status("ORDREC3", "ACTIVE")
+
+        client = CashfreeClient("id", "secret", base_url=mock.base_url)
+        reconciler = Reconciler(db, client, workers=4, rate=0, page_size=2, min_age=0)
+
+        dry = reconciler.run(dry_run=True)
+        assert db.get_payment_order("ORDREC1")["order"]["status"] == "ACTIVE"
+        assert dry["updated"] == {"PAID": 1, "EXPIRED": 1}
+
+        # Other tests may have left pending orders the mock does not know (404)
+        report = reconciler.run()
+        assert report["checked"] >= 4 and report["pages"] >= 2
+        assert report["updated"] == {"PAID": 1, "EXPIRED": 1}
+        assert report["unchanged"] == 1 and report["not_found"] >= 1 and report["errors"] == 0
+        assert db.get_payment_order("ORDREC1")["order"]["status"] == "PAID"
+        assert db.get_payment_order("ORDREC2")["order"]["status"] == "EXPIRED"
+
+        # Settled orders are no longer pending
+        assert reconciler.run()["checked"] == report["checked"] - 2
+    finally:
+        mock.stop()
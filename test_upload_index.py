@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Checks that a rescan racing with admin uploads and deletes keeps their changes.
+"""
+
+import os
+import tempfile
+
+from upload_index import UploadIndex
+
+
+def write(root, medium, name):
+    os.makedirs(os.path.join(root, medium), exist_ok=True)
+    with open(os.path.join(root, medium, name), "wb") as f:
+        f.write(b"%PDF-1.4\n")
+
+
+def test_rescan_replays_changes_made_while_scanning():
+    root = tempfile.mkdtemp()
+    write(root, "english", "OLD-001.pdf")
+    index = UploadIndex(root)
+    index.rescan()
+
+    scan = index._scan
+
+    def scan_then_race():
+        # The walk has finished when the admin uploads one file and deletes another
+        entries = scan()
+        write(root, "english", "NEW-001.pdf")
+        index.add("english", "NEW-001.pdf")
+        os.remove(os.path.join(root, "english", "OLD-001.pdf"))
+        index.remove("english", "OLD-001.pdf")
+        return entries
+
+    index._scan = scan_then_race
+    index.rescan()
+    assert [e.name for e in index.list("english")] == ["NEW-001.pdf"]
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Checks that queued webhooks are deduped per order and applied in one batch.
+"""
+
+import json
+import time
+
+import pytest
+
+from database import db
+from webhooks import (SIGNATURE_HEADER, TIMESTAMP_HEADER, WebhookProcessor, collapse_events, parse_event,
+                      sign_payload)
+
+
+@pytest.fixture
+def app_workers_stopped():
+    """Importing app starts its own webhook workers, which poll this same queue"""
+    import app as portal
+
+    portal.webhook_processor.stop()
+    yield
+    if portal.webhook_processor.workers > 0:
+        portal.webhook_processor.start()
+
+
+def test_parse_event_accepts_flat_and_nested_bodies():
+    assert parse_event('{"order_id": "ORD1", "order_status": "PAID"}') == ("ORD1", "PAID")
+    nested = {"data": {"order": {"order_id": "ORD2"}, "payment": {"payment_status": "SUCCESS"}}}
+    assert parse_event(json.dumps(nested)) == ("ORD2", "PAID")
+    nested["data"]["payment"]["payment_status"] = "FAILED"
+    assert parse_event(json.dumps(nested)) == ("ORD2", None)
+
+
+def test_collapse_keeps_paid_and_reports_bad_events():
+    events = [
+        {"id": 1, "payload": '{"order_id": "A", "order_status": "ACTIVE"}'},
+        {"id": 2, "payload": '{"order_id": "A", "order_status": "PAID"}'},
+        {"id": 3, "payload": '{"order_id": "A", "order_status": "EXPIRED"}'},
+        {"id": 4, "payload": "not json"},
+    ]
+    order_statuses, processed, failed = collapse_events(events)
+    assert order_statuses == {"A": "PAID"}
+    assert processed == [1, 2, 3]
+    assert list(failed) == [4]
+
+
+def test_batch_updates_orders_and_cached_state(app_workers_stopped):
+    user = db.register_user("Hook User", "hook@example.com", "9000000003", "password123")
+    db.create_payment_order("ORDHOOK1", user["user_id"], 10, {"courses": ["MMPC-001"]})
+    db.create_payment_order("ORDHOOK2", user["user_id"], 10, {"courses": ["MMPC-002"]})
+    assert db.get_payment_order("ORDHOOK1")["order"]["status"] == "ACTIVE"
+
+    for body in (
+        {"order_id": "ORDHOOK1", "order_status": "PAID"},
+        {"order_id": "ORDHOOK1", "order_status": "PAID"},
+        {"order_id": "ORDHOOK2", "order_status": "EXPIRED"},
+    ):
+        db.enqueue_webhook_event(body["order_id"], json.dumps(body))
+
+    processor = WebhookProcessor(db, workers=0)
+    assert processor.drain() == 3
+    assert processor.snapshot()["batches"] == 1
+    assert db.get_webhook_queue_stats()["pending"] == 0
+
+    # Cached copies were dropped, so the new statuses are visible
+    assert db.get_payment_order("ORDHOOK1")["order"]["status"] == "PAID"
+    assert db.get_payment_order("ORDHOOK2")["order"]["status"] == "EXPIRED"
+    with db.pool.connection() as conn:
+        statuses = dict(conn.execute(
+            "SELECT transaction_id, status FROM user_assignments WHERE transaction_id LIKE 'ORDHOOK%'"
+        ).fetchall())
+    assert statuses == {"ORDHOOK1": "completed", "ORDHOOK2": "failed"}
+
+
+def test_callback_rejects_unsigned_and_forged_webhooks(app_workers_stopped):
+    import app as portal
+
+    client = portal.app.test_client()
+    body = json.dumps({"order_id": "ORDFORGED", "order_status": "PAID"}).encode()
+    before = db.get_webhook_queue_stats()["pending"]
+
+    def post(secret, timestamp=None):
+        timestamp = timestamp or str(int(time.time() * 1000))
+        headers = {TIMESTAMP_HEADER: timestamp, SIGNATURE_HEADER: sign_payload(secret, timestamp, body)}
+        return client.post("/payment-callback", data=body, headers=headers, content_type="application/json")
+
+    assert client.post("/payment-callback", data=body, content_type="application/json").status_code == 401
+    assert post("not-the-secret").status_code == 401
+    assert post(portal.CASHFREE_SECRET_KEY, timestamp=str(int((time.time() - 2 * 86400) * 1000))).status_code == 401
+    assert db.get_webhook_queue_stats()["pending"] == before
+
+    assert post(portal.CASHFREE_SECRET_KEY).status_code == 200
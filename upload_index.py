@@ -0,0 +1,169 @@
+import os
+import threading
+import time
+
+from static_cache import file_hashes
+
+UPLOAD_MEDIA = ("english", "hindi")
+
+
+def _normalize(relative_path):
+    return os.path.normpath(relative_path).replace("\\", "/")
+
+
+class UploadEntry:
+    """One file under uploads/<medium>/, as of the last scan or admin change"""
+
+    __slots__ = ("medium", "relative_path", "name", "path", "stat")
+
+    def __init__(self, medium, relative_path, path, stat):
+        self.medium = medium
+        self.relative_path = relative_path
+        self.name = os.path.basename(relative_path)
+        self.path = path
+        self.stat = stat
+
+    @property
+    def size(self):
+        return self.stat.st_size
+
+    @property
+    def modified(self):
+        return self.stat.st_mtime
+
+    @property
+    def public_url(self):
+        return f"/uploads/{self.medium}/{self.relative_path}"
+
+    @property
+    def digest(self):
+        # Hashed on first use, then served from file_hashes without touching the disk
+        return file_hashes.digest(self.path, stat=self.stat)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "relative_path": self.relative_path,
+            "public_url": self.public_url,
+            "size": self.size,
+            "modified": self.modified,
+        }
+
+
+class UploadIndex:
+    """In-memory index of uploaded course PDFs, keyed by (medium, relative path).
+
+    Built once at startup and updated in place by the admin upload routes.
+    Changes made behind the app's back (copying files onto the server) are
+    picked up by a background rescan at most every `rescan_interval` seconds,
+    so lookups and listings never walk the directory tree on a request thread.
+    """
+
+    def __init__(self, root="uploads", rescan_interval=60.0):
+        self.root = root
+        self.rescan_interval = rescan_interval
+        self._entries = {}
+        self._scanned_at = 0.0
+        self._lock = threading.Lock()
+        self._rescanning = False
+        # One list per scan in progress: admin changes made while it walks the disk
+        self._pending_changes = []
+
+    def _stat_entry(self, medium, relative_path):
+        relative_path = _normalize(relative_path)
+        path = os.path.join(self.root, medium, relative_path)
+        return UploadEntry(medium, relative_path, path, os.stat(path))
+
+    def _scan(self):
+        entries = {}
+        for medium in UPLOAD_MEDIA:
+            base_dir = os.path.join(self.root, medium)
+            for root, _, filenames in os.walk(base_dir):
+                for name in filenames:
+                    rel = _normalize(os.path.relpath(os.path.join(root, name), base_dir))
+                    try:
+                        entries[(medium, rel)] = self._stat_entry(medium, rel)
+                    except OSError:
+                        continue  # removed while walking
+        return entries
+
+    def _record(self, key, entry):
+        # Caller holds the lock; entry None means removed
+        if entry is None:
+            self._entries.pop(key, None)
+        else:
+            self._entries[key] = entry
+        for changes in self._pending_changes:
+            changes.append((key, entry))
+
+    def rescan(self):
+        """Rebuild the index from disk and swap it in.
+
+        An upload or delete that lands while the disk is being walked may or
+        may not be seen by the walk, so it is replayed over the new entries
+        before they replace the old ones.
+        """
+        changes = []
+        with self._lock:
+            self._pending_changes.append(changes)
+        try:
+            entries = self._scan()
+        except BaseException:
+            with self._lock:
+                self._pending_changes.remove(changes)
+            raise
+        with self._lock:
+            self._pending_changes.remove(changes)
+            for key, entry in changes:
+                if entry is None:
+                    entries.pop(key, None)
+                else:
+                    entries[key] = entry
+            self._entries = entries
+            self._scanned_at = time.monotonic()
+        return len(entries)
+
+    def _rescan_in_background(self):
+        try:
+            self.rescan()
+        except Exception as e:
+            print(f"⚠️ Upload index rescan failed: {e}")
+        finally:
+            self._rescanning = False
+
+    def _maybe_rescan(self):
+        if time.monotonic() - self._scanned_at < self.rescan_interval or self._rescanning:
+            return
+        with self._lock:
+            if self._rescanning:
+                return
+            self._rescanning = True
+        threading.Thread(target=self._rescan_in_background, name="upload-index-rescan", daemon=True).start()
+
+    def get(self, medium, relative_path):
+        self._maybe_rescan()
+        return self._entries.get((medium, relative_path))
+
+    def list(self, medium):
+        """Entries for a medium, ordered by relative path"""
+        self._maybe_rescan()
+        with self._lock:
+            entries = [e for (m, _), e in self._entries.items() if m == medium]
+        return sorted(entries, key=lambda e: e.relative_path)
+
+    def add(self, medium, relative_path):
+        """Record a file that was just written (or overwritten) on disk"""
+        entry = self._stat_entry(medium, relative_path)
+        file_hashes.forget(entry.path)
+        with self._lock:
+            self._record((medium, entry.relative_path), entry)
+        return entry
+
+    def remove(self, medium, relative_path):
+        key = (medium, _normalize(relative_path))
+        with self._lock:
+            entry = self._entries.get(key)
+            self._record(key, None)
+        if entry is not None:
+            file_hashes.forget(entry.path)
+        return entry
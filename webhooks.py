@@ -0,0 +1,197 @@
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+
+# Cashfree signs every delivery: base64(HMAC-SHA256(secret key, x-webhook-timestamp + raw body))
+SIGNATURE_HEADER = "x-webhook-signature"
+TIMESTAMP_HEADER = "x-webhook-timestamp"
+
+# Payment-level webhook results mapped onto order statuses. Failed or dropped
+# payments leave the order ACTIVE: the customer can still retry and pay it.
+ORDER_STATUS_BY_PAYMENT_STATUS = {"SUCCESS": "PAID"}
+
+# An order never leaves PAID; otherwise the most recent event for an order wins
+TERMINAL_ORDER_STATUSES = ("PAID",)
+
+
+def sign_payload(secret, timestamp, body):
+    """Cashfree's webhook signature for a raw body sent at `timestamp` (ms since epoch)"""
+    if isinstance(body, str):
+        body = body.encode()
+    digest = hmac.new(secret.encode(), str(timestamp).encode() + body, hashlib.sha256).digest()
+    return base64.b64encode(digest).decode()
+
+
+def verify_signature(secret, timestamp, body, signature, max_age=86400, now=None):
+    """True if `signature` is Cashfree's signature of `body` and the timestamp is no more
+    than `max_age` seconds away from now (0 skips the age check)"""
+    if not secret or not timestamp or not signature:
+        return False
+    try:
+        sent = int(timestamp) / 1000
+    except ValueError:
+        return False
+    if max_age and abs((time.time() if now is None else now) - sent) > max_age:
+        return False
+    return hmac.compare_digest(signature, sign_payload(secret, timestamp, body))
+
+
+def parse_event(payload):
+    """Return (order_id, order_status) from a raw webhook body.
+
+    Accepts both the flat {"order_id", "order_status"} shape and Cashfree's
+    {"data": {"order": {...}, "payment": {...}}} shape. order_status is None
+    when the event does not change the order's status.
+    """
+    data = json.loads(payload) if isinstance(payload, (str, bytes)) else payload
+    if not isinstance(data, dict):
+        raise ValueError("Webhook body is not a JSON object")
+
+    body = data.get("data") if isinstance(data.get("data"), dict) else {}
+    order = body.get("order") or {}
+    payment = body.get("payment") or {}
+
+    order_id = data.get("order_id") or order.get("order_id")
+    if not order_id:
+        raise ValueError("Webhook has no order_id")
+
+    order_status = data.get("order_status") or order.get("order_status")
+    if not order_status:
+        order_status = ORDER_STATUS_BY_PAYMENT_STATUS.get(payment.get("payment_status"))
+    return str(order_id), order_status
+
+
+def order_id_of(payload):
+    """Best-effort order_id for indexing a raw event; None if it cannot be parsed"""
+    try:
+        return parse_event(payload)[0]
+    except (ValueError, TypeError):
+        return None
+
+
+def collapse_events(events):
+    """Dedupe a claimed batch by order_id.
+
+    Returns (order_statuses, processed_ids, failed) where order_statuses holds
+    one final status per order, processed_ids are the event ids consumed and
+    failed maps unparseable event ids to an error message.
+    """
+    order_statuses = {}
+    processed = []
+    failed = {}
+    for event in events:
+        try:
+            order_id, status = parse_event(event["payload"])
+        except (ValueError, TypeError) as e:
+            failed[event["id"]] = str(e)
+            continue
+        processed.append(event["id"])
+        if status is None or order_statuses.get(order_id) in TERMINAL_ORDER_STATUSES:
+            continue
+        order_statuses[order_id] = status
+    return order_statuses, processed, failed
+
+
+class WebhookProcessor:
+    """Background worker pool draining the webhook_events queue in batches.
+
+    The webhook endpoint only inserts the raw event and calls notify(); workers
+    claim up to `batch_size` events at a time (claims are atomic, so workers
+    never share an event), collapse them to one status per order and apply the
+    whole batch in a single transaction. Events left behind by a crashed
+    worker are reclaimed after `stale_after` seconds, so nothing is lost
+    across restarts.
+    """
+
+    def __init__(self, database, workers=2, batch_size=100, poll_interval=5.0, stale_after=300):
+        self.db = database
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.events_processed = 0
+        self.events_failed = 0
+        self.last_error = None
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"webhook-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout=5):
+        self._stopping.set()
+        self._wakeup.set()
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+    def notify(self):
+        """Wake the workers now instead of at the next poll"""
+        self._wakeup.set()
+
+    def process_batch(self):
+        """Claim and apply one batch; returns the number of events claimed"""
+        claimed = self.db.claim_webhook_events(self.batch_size, self.stale_after)
+        if not claimed["success"]:
+            self.last_error = claimed["error"]
+            return 0
+        events = claimed["events"]
+        if not events:
+            return 0
+
+        order_statuses, processed, failed = collapse_events(events)
+        result = self.db.apply_webhook_batch(order_statuses, processed, failed)
+        if not result["success"]:
+            # Left claimed; becomes claimable again once stale
+            self.last_error = result["error"]
+            return len(events)
+
+        with self._lock:
+            self.batches += 1
+            self.events_processed += len(processed)
+            self.events_failed += len(failed)
+        return len(events)
+
+    def drain(self):
+        """Process batches until the queue is empty (used by tests and scripts)"""
+        total = 0
+        while True:
+            claimed = self.process_batch()
+            if not claimed:
+                return total
+            total += claimed
+
+    def _run(self):
+        while not self._stopping.is_set():
+            # Cleared before claiming, so a notify() during the batch is not lost
+            self._wakeup.clear()
+            try:
+                if self.process_batch() >= self.batch_size:
+                    continue
+            except Exception as e:
+                self.last_error = str(e)
+            self._wakeup.wait(self.poll_interval)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "workers": len(self._threads),
+                "batches": self.batches,
+                "events_processed": self.events_processed,
+                "events_failed": self.events_failed,
+                "last_error": self.last_error,
+            }
@@ -0,0 +1,67 @@
+import io
+import os
+import time
+import zipfile
+
+# Read size for files copied from disk into the archive
+CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Unseekable sink that collects what ZipFile writes until it is drained.
+
+    Because it cannot seek, ZipFile writes each entry's CRC and sizes in a data
+    descriptor after the entry instead of going back to patch the local header,
+    so nothing before the current chunk has to be kept.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(entries):
+    """Yield a ZIP archive chunk by chunk.
+
+    `entries` is an iterable of (arcname, source) where source is either the PDF
+    bytes or a path on disk. Entries are STORED (PDFs are already compressed), so
+    the archive costs a CRC pass and nothing else; memory use is bounded by one
+    in-memory entry or CHUNK_SIZE for files read from disk. `entries` is consumed
+    lazily, so expensive entries are only produced once earlier ones have been
+    sent.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+        for arcname, source in entries:
+            info = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_STORED
+            if isinstance(source, (bytes, bytearray)):
+                info.file_size = len(source)
+                with archive.open(info, "w") as dest:
+                    dest.write(source)
+            else:
+                info.file_size = os.path.getsize(source)
+                with open(source, "rb") as src, archive.open(info, "w") as dest:
+                    for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                        dest.write(chunk)
+                        data = buffer.drain()
+                        if data:
+                            yield data
+            data = buffer.drain()
+            if data:
+                yield data
+    # Central directory
+    data = buffer.drain()
+    if data:
+        yield data